@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the compliance checker hot paths.
+Measures parse_requirements, extract_keywords, check_requirement and
+analyze_compliance on a deterministic synthetic corpus, reporting
+throughput, peak memory and the fitted complexity exponent per stage.
+Usage: python bench_compliance.py [--full] [--no-memory] [--json PATH]
+                                  [--baseline PATH] [--tolerance 0.25]
+"""
+
+import json
+import math
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'scripts'))
+
+from compliance_checker import (  # noqa: E402
+    analyze_compliance,
+    check_requirement,
+    extract_keywords,
+    parse_requirements
+)
+from corpus import generate_document, generate_requirements  # noqa: E402
+from document_index import DocumentIndex  # noqa: E402
+
+KB = 1024
+MB = 1024 * 1024
+
+QUICK = {
+    'doc_sizes': [10 * KB, 100 * KB, 1 * MB],
+    'requirement_counts': [10, 100, 1000],
+    'fixed_requirements': 1000,
+    'fixed_doc_size': 1 * MB,
+}
+
+FULL = {
+    'doc_sizes': [10 * KB, 100 * KB, 1 * MB, 10 * MB, 50 * MB],
+    'requirement_counts': [10, 100, 1000, 10000, 100000],
+    'fixed_requirements': 1000,
+    'fixed_doc_size': 1 * MB,
+}
+
+# Each measurement is the best of ROUNDS rounds; fast calls are repeated
+# within a round until it lasts ROUND_SECONDS
+ROUNDS = 5
+ROUND_SECONDS = 0.05
+
+# Requirements sampled for the per-call check_requirement measurement
+CHECK_SAMPLE = 200
+
+
+def timed(func):
+    """Return the best-of-rounds average seconds per call."""
+    best = None
+    for _ in range(ROUNDS):
+        repeat = 0
+        start = time.perf_counter()
+        while True:
+            func()
+            repeat += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= ROUND_SECONDS:
+                break
+        per_call = elapsed / repeat
+        if best is None or per_call < best:
+            best = per_call
+    return best
+
+
+def peak_memory(func):
+    """Return peak traced allocation in bytes for one call."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def fit_exponent(points):
+    """Least-squares slope of log(seconds) against log(size)."""
+    points = [(math.log(n), math.log(s)) for n, s in points if n > 0 and s > 0]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if not var_x:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+
+
+def run_suite(config, measure_memory=True):
+    """Run every stage over both size axes; returns a list of result rows."""
+    rows = []
+
+    def record(stage, axis, size, seconds, units, func):
+        row = {
+            'stage': stage,
+            'axis': axis,
+            'size': size,
+            'seconds': seconds,
+            'throughput': units / seconds if seconds else None,
+            'peak_bytes': peak_memory(func) if measure_memory else None,
+        }
+        rows.append(row)
+        peak = f"{row['peak_bytes'] / MB:8.1f} MB" if row['peak_bytes'] is not None else '       -   '
+        print(f"  {stage:<20} {axis:<13} {size:>10} {seconds * 1e3:>11.2f} ms "
+              f"{row['throughput']:>14.1f}/s {peak}", flush=True)
+
+    print(f"  {'stage':<20} {'axis':<13} {'size':>10} {'time':>14} {'throughput':>16} {'peak':>11}")
+
+    # Requirement-count axis against a fixed document
+    document = generate_document(config['fixed_doc_size'])
+    for count in config['requirement_counts']:
+        text = generate_requirements(count)
+        requirements = parse_requirements(text)
+
+        def parse():
+            parse_requirements(text)
+
+        def keywords():
+            for req in requirements:
+                extract_keywords(req['requirement'].lower())
+
+        def analyze():
+            analyze_compliance(parse_requirements(text), document)
+
+        record('parse_requirements', 'requirements', count, timed(parse), count, parse)
+        record('extract_keywords', 'requirements', count, timed(keywords), count, keywords)
+        record('analyze_compliance', 'requirements', count, timed(analyze), count, analyze)
+
+    # Document-size axis with a fixed requirement set
+    text = generate_requirements(config['fixed_requirements'])
+    requirements = parse_requirements(text)
+    sample = requirements[:CHECK_SAMPLE]
+    for size in config['doc_sizes']:
+        document = generate_document(size)
+        index = DocumentIndex(document)
+
+        def check():
+            for req in sample:
+                check_requirement(req, index)
+
+        def analyze():
+            analyze_compliance(parse_requirements(text), document)
+
+        record('check_requirement', 'doc_bytes', size, timed(check) / len(sample), 1, check)
+        record('analyze_compliance', 'doc_bytes', size, timed(analyze), size, analyze)
+
+    return rows
+
+
+def print_complexity(rows):
+    print("\nComplexity (fitted exponent of time vs size):")
+    curves = {}
+    for row in rows:
+        curves.setdefault((row['stage'], row['axis']), []).append((row['size'], row['seconds']))
+    for (stage, axis), points in curves.items():
+        exponent = fit_exponent(points)
+        if exponent is not None:
+            print(f"  {stage:<20} vs {axis:<13} O(n^{exponent:.2f})")
+
+
+def compare_baseline(rows, baseline_rows, tolerance):
+    """Print throughput regressions against a baseline; returns their count."""
+    baseline = {(r['stage'], r['axis'], r['size']): r for r in baseline_rows}
+    regressions = 0
+    print(f"\nBaseline comparison (tolerance {tolerance:.0%}):")
+    for row in rows:
+        base = baseline.get((row['stage'], row['axis'], row['size']))
+        if not base or not base['throughput'] or not row['throughput']:
+            continue
+        ratio = row['throughput'] / base['throughput']
+        if ratio < 1 - tolerance:
+            regressions += 1
+            print(f"  REGRESSION {row['stage']} {row['axis']}={row['size']}: "
+                  f"{ratio:.2f}x baseline throughput")
+    if not regressions:
+        print("  No regressions")
+    return regressions
+
+
+def main():
+    config = FULL if '--full' in sys.argv else QUICK
+    measure_memory = '--no-memory' not in sys.argv
+    json_path = None
+    baseline_path = None
+    tolerance = 0.25
+
+    if '--json' in sys.argv:
+        idx = sys.argv.index('--json')
+        if idx + 1 < len(sys.argv):
+            json_path = sys.argv[idx + 1]
+
+    if '--baseline' in sys.argv:
+        idx = sys.argv.index('--baseline')
+        if idx + 1 < len(sys.argv):
+            baseline_path = sys.argv[idx + 1]
+
+    if '--tolerance' in sys.argv:
+        idx = sys.argv.index('--tolerance')
+        if idx + 1 < len(sys.argv):
+            tolerance = float(sys.argv[idx + 1])
+
+    rows = run_suite(config, measure_memory)
+    print_complexity(rows)
+
+    if json_path:
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump({'rows': rows}, f, indent=2)
+        print(f"\nWrote: {json_path}")
+
+    if baseline_path:
+        with open(baseline_path, 'r', encoding='utf-8') as f:
+            baseline_rows = json.load(f)['rows']
+        if compare_baseline(rows, baseline_rows, tolerance):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark evidence snippet extraction on pathological single-line input.
+PDF text often arrives as one huge line with no newlines, which made the old
+`.{0,100}\\bkw\\b.{0,100}` regex backtrack across the whole line.
+Usage: python bench_evidence.py [--sizes 65536,262144,1048576] [--skip-regex]
+"""
+
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'scripts'))
+
+from document_index import DocumentIndex  # noqa: E402
+from evidence import evidence_snippet  # noqa: E402
+
+FILLER_WORDS = [
+    'policy', 'control', 'customer', 'review', 'board', 'monitoring',
+    'transaction', 'report', 'staff', 'training', 'risk', 'assessment',
+]
+TARGET_WORDS = ['sanctions', 'escalation', 'beneficial', 'retention', 'outsourcing']
+
+
+def build_single_line(size, seed=0):
+    """Build a single line of roughly size characters with targets near the end."""
+    rng = random.Random(seed)
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(FILLER_WORDS)
+        words.append(word)
+        length += len(word) + 1
+
+    # Place every target word in the last few percent of the line
+    for i, target in enumerate(TARGET_WORDS):
+        words.insert(len(words) - 1 - i * 7, target)
+
+    return ' '.join(words)
+
+
+def regex_snippet(text, keyword):
+    """Evidence extraction as previously done in check_requirement."""
+    pattern = r'.{0,100}\b' + re.escape(keyword) + r'\b.{0,100}'
+    for match in list(re.finditer(pattern, text, re.IGNORECASE))[:1]:
+        return match.group(0).strip()[:150]
+    return None
+
+
+def time_per_call(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    sizes = [64 * 1024, 256 * 1024, 1024 * 1024]
+    if '--sizes' in sys.argv:
+        idx = sys.argv.index('--sizes')
+        if idx + 1 < len(sys.argv):
+            sizes = [int(s) for s in sys.argv[idx + 1].split(',')]
+    skip_regex = '--skip-regex' in sys.argv
+
+    print(f"{'size':>10} {'index build':>12} {'offset snippet':>15} {'regex snippet':>14}")
+
+    for size in sizes:
+        text = build_single_line(size)
+
+        start = time.perf_counter()
+        index = DocumentIndex(text)
+        build_time = time.perf_counter() - start
+
+        def offset_snippets():
+            for keyword in TARGET_WORDS:
+                offset = index.first_occurrence(keyword)
+                evidence_snippet(index.text, offset, offset + len(keyword))
+
+        per_snippet = time_per_call(offset_snippets, 200) / len(TARGET_WORDS)
+
+        if skip_regex:
+            regex_cell = 'skipped'
+        else:
+            def regex_snippets():
+                for keyword in TARGET_WORDS:
+                    regex_snippet(text, keyword)
+
+            regex_per_snippet = time_per_call(regex_snippets, 1) / len(TARGET_WORDS)
+            regex_cell = f"{regex_per_snippet * 1e3:.1f} ms"
+
+        print(f"{len(text):>10} {build_time * 1e3:>9.1f} ms {per_snippet * 1e6:>12.2f} us {regex_cell:>14}")
+
+
+if __name__ == '__main__':
+    main()
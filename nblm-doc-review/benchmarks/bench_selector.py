@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark notebook selection on synthetic libraries.
+Compares the full score_notebook scan with the library index (build,
+load from disk, first and memoized scoring, top-k selection) and checks
+that the index returns exactly the score_notebook scores. The cold
+columns time a fresh process's path: json.load of library.json plus the
+scan, against load_library_index from disk plus top-k selection.
+Usage: python bench_selector.py [--full] [--sizes N,N,...]
+"""
+
+import json
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'scripts'))
+
+import library_index  # noqa: E402
+from bench_compliance import timed  # noqa: E402
+from corpus import generate_document, generate_library  # noqa: E402
+from library_index import LibraryIndex, index_path_for, library_notebooks, load_library_index  # noqa: E402
+from notebook_selector import extract_keywords, score_notebook, select_notebooks  # noqa: E402
+
+QUICK_SIZES = [1000, 10000]
+FULL_SIZES = [1000, 10000, 50000, 100000]
+
+# Extra random keyword sets checked against score_notebook per library
+VERIFY_QUERIES = 20
+TOP_K = 10
+
+
+def scan_select(notebooks, keywords, threshold=5):
+    """The original selection: score every notebook, then sort them all."""
+    scored = []
+    for notebook in notebooks:
+        score = score_notebook(notebook, keywords)
+        if score >= threshold:
+            scored.append({'notebook': notebook, 'score': score})
+    scored.sort(key=lambda x: x['score'], reverse=True)
+    return scored
+
+
+def verify(index, notebooks, keyword_sets):
+    """Count notebooks whose index score differs from score_notebook."""
+    mismatches = 0
+    for keywords in keyword_sets:
+        scores = index.score(keywords)
+        for notebook_id, notebook in enumerate(notebooks):
+            if scores.get(notebook_id, 0) != score_notebook(notebook, keywords):
+                mismatches += 1
+    return mismatches
+
+
+def bench_size(size, keywords, rng):
+    library = generate_library(size)
+    notebooks = library_notebooks(library)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        library_path = Path(tmp) / 'library.json'
+        library_path.write_text(json.dumps(library), encoding='utf-8')
+
+        scan = timed(lambda: scan_select(notebooks, keywords))
+        build = timed(lambda: LibraryIndex.build(notebooks))
+
+        # First call builds and saves the index; later loads read it back
+        load_library_index(library_path)
+
+        def load():
+            library_index._loaded.clear()
+            load_library_index(library_path)
+
+        load_seconds = timed(load)
+
+        def cold_scan():
+            with open(library_path, encoding='utf-8') as f:
+                scan_select(library_notebooks(json.load(f)), keywords)
+
+        def cold_select():
+            library_index._loaded.clear()
+            load_library_index(library_path).select(keywords, top_k=TOP_K)
+
+        cold_scan_seconds = timed(cold_scan)
+        cold_select_seconds = timed(cold_select)
+        library_kb = library_path.stat().st_size / 1024
+        index_kb = index_path_for(library_path).stat().st_size / 1024
+
+        index = load_library_index(library_path)
+
+        def first_score():
+            index._rows.clear()
+            index.score(keywords)
+
+        score_cold = timed(first_score)
+        index.score(keywords)
+        score_warm = timed(lambda: index.score(keywords))
+        select_all = timed(lambda: select_notebooks(library_path, keywords))
+        select_top = timed(lambda: select_notebooks(library_path, keywords, top_k=TOP_K))
+
+        expected = scan_select(notebooks, keywords)
+        ok = select_notebooks(library_path, keywords) == expected
+        ok = ok and select_notebooks(library_path, keywords, top_k=TOP_K) == expected[:TOP_K]
+
+        vocabulary = sorted({run for run in index.runs_text.split('\n') if len(run) >= 3})
+        keyword_sets = [keywords] + [
+            rng.sample(vocabulary, min(20, len(vocabulary))) for _ in range(VERIFY_QUERIES)
+        ]
+        mismatches = verify(index, notebooks, keyword_sets)
+
+    print(f"  {size:>7} {scan * 1e3:>10.2f} {build * 1e3:>10.2f} {load_seconds * 1e3:>10.2f} "
+          f"{score_cold * 1e3:>10.3f} {score_warm * 1e3:>10.3f} {select_all * 1e3:>10.3f} "
+          f"{select_top * 1e3:>10.3f} {scan / select_top:>9.0f}x "
+          f"{cold_scan_seconds * 1e3:>10.2f} {cold_select_seconds * 1e3:>10.2f} "
+          f"{library_kb:>10.0f} {index_kb:>10.0f} "
+          f"{'ok' if ok and not mismatches else 'MISMATCH'}", flush=True)
+    return ok and not mismatches
+
+
+def main():
+    sizes = FULL_SIZES if '--full' in sys.argv else QUICK_SIZES
+    if '--sizes' in sys.argv:
+        idx = sys.argv.index('--sizes')
+        if idx + 1 < len(sys.argv):
+            sizes = [int(s) for s in sys.argv[idx + 1].split(',')]
+
+    keywords = extract_keywords(generate_document(100 * 1024))
+    rng = random.Random(0)
+
+    print(f"Times in ms per call; 'speedup' is the scan against memoized top-{TOP_K} selection;")
+    print("sizes of library.json and its saved index in KB")
+    print(f"  {'notebooks':>7} {'scan':>10} {'build':>10} {'load':>10} {'score':>10} "
+          f"{'memoized':>10} {'select':>10} {'top-' + str(TOP_K):>10} {'speedup':>10} "
+          f"{'cold scan':>10} {'cold top-k':>10} {'library':>10} {'index':>10} scores")
+
+    failed = 0
+    for size in sizes:
+        if not bench_size(size, keywords, rng):
+            failed += 1
+
+    if failed:
+        print(f"\n{failed} library size(s) returned scores different from score_notebook")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Deterministic synthetic corpus for compliance checker benchmarks.
+Generates policy-style documents and NotebookLM-style requirement lists
+of a requested size; the same seed always produces the same text.
+Usage: python corpus.py <output_dir> [--doc-size BYTES] [--requirements N] [--seed N]
+"""
+
+import random
+import sys
+from pathlib import Path
+
+POLICY_TERMS = [
+    'governance', 'board', 'oversight', 'risk', 'assessment', 'customer',
+    'diligence', 'enhanced', 'beneficial', 'ownership', 'transaction',
+    'monitoring', 'suspicious', 'activity', 'reporting', 'record', 'keeping',
+    'retention', 'training', 'staff', 'sanctions', 'screening', 'escalation',
+    'independent', 'audit', 'officer', 'compliance', 'outsourcing', 'vendor',
+    'privacy', 'data', 'protection', 'incident', 'response', 'wallet',
+    'blockchain', 'analytics', 'threshold', 'approval', 'exception',
+]
+
+# Terms that requirements mention but policies rarely do, so some
+# requirements come out missing
+RARE_TERMS = [
+    'travel', 'rule', 'correspondent', 'nesting', 'whistleblower',
+    'attestation', 'penetration', 'segregation', 'cryptographic', 'custody',
+]
+
+FILLER = [
+    'the', 'company', 'shall', 'must', 'ensure', 'that', 'all', 'relevant',
+    'procedures', 'are', 'documented', 'and', 'reviewed', 'annually', 'by',
+    'appropriate', 'personnel', 'with', 'clear', 'responsibilities', 'for',
+]
+
+REQUIREMENT_OPENERS = [
+    'You must', 'The firm should', 'Institutions shall', 'Licensees are required to',
+    'Management must', 'The compliance function shall',
+]
+
+
+def _sentence(rng, min_words=8, max_words=24):
+    words = []
+    for _ in range(rng.randint(min_words, max_words)):
+        words.append(rng.choice(POLICY_TERMS) if rng.random() < 0.45 else rng.choice(FILLER))
+    return ' '.join(words).capitalize() + '.'
+
+
+def generate_document(size, seed=0):
+    """Generate a policy document of about size characters."""
+    rng = random.Random(seed)
+    lines = []
+    length = 0
+    section = 0
+
+    while length < size:
+        section += 1
+        heading = f"{section}. {rng.choice(POLICY_TERMS).title()} and {rng.choice(POLICY_TERMS).title()}"
+        lines.append(heading)
+        length += len(heading) + 1
+
+        for _ in range(rng.randint(2, 6)):
+            paragraph = ' '.join(_sentence(rng) for _ in range(rng.randint(2, 6)))
+            lines.append(paragraph)
+            length += len(paragraph) + 1
+
+    return '\n'.join(lines)[:size]
+
+
+def generate_requirements(count, seed=0, per_category=8):
+    """Generate a NotebookLM-style answer with count requirement bullets."""
+    rng = random.Random(seed + 1)
+    lines = []
+    category = 0
+
+    for i in range(count):
+        if i % per_category == 0:
+            category += 1
+            lines.append(f"{category}. {rng.choice(POLICY_TERMS).title()} Requirements")
+
+        terms = [rng.choice(POLICY_TERMS) for _ in range(rng.randint(3, 7))]
+        if rng.random() < 0.3:
+            terms.extend(rng.choice(RARE_TERMS) for _ in range(rng.randint(2, 4)))
+        rng.shuffle(terms)
+        lines.append(f"• {rng.choice(REQUIREMENT_OPENERS)} {' '.join(terms)} for all relevant activities.")
+
+    return '\n'.join(lines)
+
+
+def generate_library(count, seed=0, vocabulary_size=5000):
+    """
+    Generate a NotebookLM library.json structure with count notebooks.
+    Beyond the policy terms, notebooks draw from a synthetic vocabulary of
+    vocabulary_size terms so large libraries stay diverse.
+    """
+    rng = random.Random(seed + 2)
+    vocabulary = POLICY_TERMS + RARE_TERMS + [f"topic{i}" for i in range(vocabulary_size)]
+    notebooks = {}
+
+    for i in range(count):
+        notebook_id = f"notebook-{i}"
+        notebooks[notebook_id] = {
+            'id': notebook_id,
+            'name': ' '.join(rng.choice(vocabulary).title() for _ in range(rng.randint(2, 5))),
+            'url': f"https://notebooklm.google.com/notebook/{notebook_id}",
+            'description': ' '.join(
+                rng.choice(vocabulary) if rng.random() < 0.5 else rng.choice(FILLER)
+                for _ in range(rng.randint(10, 40))
+            ),
+            'topics': [rng.choice(vocabulary).title() for _ in range(rng.randint(1, 6))],
+        }
+
+    return {'notebooks': notebooks}
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python corpus.py <output_dir> [--doc-size BYTES] [--requirements N] [--seed N]")
+        sys.exit(1)
+
+    out_dir = Path(sys.argv[1])
+    doc_size = 1024 * 1024
+    count = 1000
+    seed = 0
+
+    if '--doc-size' in sys.argv:
+        idx = sys.argv.index('--doc-size')
+        if idx + 1 < len(sys.argv):
+            doc_size = int(sys.argv[idx + 1])
+
+    if '--requirements' in sys.argv:
+        idx = sys.argv.index('--requirements')
+        if idx + 1 < len(sys.argv):
+            count = int(sys.argv[idx + 1])
+
+    if '--seed' in sys.argv:
+        idx = sys.argv.index('--seed')
+        if idx + 1 < len(sys.argv):
+            seed = int(sys.argv[idx + 1])
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    doc_path = out_dir / f"policy_{doc_size}.txt"
+    req_path = out_dir / f"requirements_{count}.txt"
+    doc_path.write_text(generate_document(doc_size, seed), encoding='utf-8')
+    req_path.write_text(generate_requirements(count, seed), encoding='utf-8')
+
+    print(f"Wrote: {doc_path}")
+    print(f"Wrote: {req_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+On-disk cache of NotebookLM answers.
+Entries are keyed by notebook id, question text and a stamp identifying
+the notebook's sources, so repeat reviews skip the NotebookLM round trip
+until an answer expires, the notebook changes or the entry is evicted.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+from extraction_cache import evict
+
+CACHE_VERSION = 1
+
+# Override the cache location, or set to "off" to disable caching
+CACHE_DIR_ENV = 'NBLM_ANSWER_CACHE'
+
+# Answers older than this are asked again
+DEFAULT_TTL = 7 * 24 * 3600
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def default_cache_dir():
+    """Return the cache directory, or None if caching is disabled."""
+    configured = os.environ.get(CACHE_DIR_ENV)
+    if configured:
+        if configured.lower() in ('0', 'off', 'none', 'false'):
+            return None
+        return Path(configured).expanduser()
+    return Path.home() / '.cache' / 'agent-skills' / 'answers'
+
+
+def notebook_stamp(notebook):
+    """Stamp a notebook's full library.json entry so answers are re-asked when it changes."""
+    return hashlib.sha256(json.dumps(notebook, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+class AnswerCache:
+    """
+    TTL-bounded answer cache, one JSON file per entry.
+    Reads refresh an entry's mtime and the least recently used entries are
+    evicted past max_bytes. Counts hits, misses and expired entries; safe
+    to share between query threads.
+    """
+
+    def __init__(self, cache_dir=None, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self._lock = threading.Lock()
+
+    def _path(self, notebook_id, question, stamp):
+        key = hashlib.sha256(
+            json.dumps([CACHE_VERSION, notebook_id, question, stamp]).encode('utf-8')).hexdigest()
+        return self.cache_dir / f"{key}.json"
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def get(self, notebook_id, question, stamp=''):
+        """Return the cached answer, or None on a miss or an expired entry."""
+        if self.cache_dir is None:
+            return None
+        path = self._path(notebook_id, question, stamp)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.loads(f.read())
+            created = entry['created']
+            answer = entry['answer']
+        except (OSError, ValueError, KeyError, TypeError):
+            self._count('misses')
+            return None
+
+        if self.ttl is not None and time.time() - created > self.ttl:
+            self._count('expired')
+            self._count('misses')
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+
+        # Touch the entry so eviction sees it as recently used
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        self._count('hits')
+        return answer
+
+    def put(self, notebook_id, question, answer, stamp=''):
+        """Store an answer; a read-only or full cache is silently skipped."""
+        if self.cache_dir is None:
+            return
+        path = self._path(notebook_id, question, stamp)
+        entry = {
+            'notebook_id': notebook_id,
+            'question': question,
+            'stamp': stamp,
+            'created': time.time(),
+            'answer': answer
+        }
+        tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps(entry))
+            os.replace(tmp_path, path)
+            evict(self.cache_dir, self.max_bytes)
+        except OSError:
+            pass
+
+    def summary(self):
+        """One-line hit/miss summary for the current process."""
+        lookups = self.hits + self.misses
+        rate = f", {100 * self.hits / lookups:.0f}% hit rate" if lookups else ''
+        expired = f" ({self.expired} expired)" if self.expired else ''
+        return f"{self.hits} hit(s), {self.misses} miss(es){expired}{rate}"
+
+
+def main():
+    """
+    Usage: python answer_cache.py [--clear]
+    Show the size of the answer cache, or delete every entry.
+    """
+    cache_dir = default_cache_dir()
+    if cache_dir is None:
+        print(f"Answer cache is disabled ({CACHE_DIR_ENV})")
+        return
+    if not cache_dir.exists():
+        print(f"Answer cache is empty: {cache_dir}")
+        return
+
+    entries = [entry for entry in os.scandir(cache_dir) if entry.name.endswith('.json')]
+    if '--clear' in sys.argv:
+        for entry in entries:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+        print(f"Removed {len(entries)} cached answer(s) from {cache_dir}")
+        return
+
+    total = 0
+    for entry in entries:
+        try:
+            total += entry.stat().st_size
+        except OSError:
+            pass
+    print(f"{cache_dir}: {len(entries)} cached answer(s), {total / 1024:.0f} KB")
+
+
+if __name__ == '__main__':
+    main()
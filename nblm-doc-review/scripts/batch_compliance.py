@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Batch compliance checking of many documents against one requirement set.
+Requirements are parsed once; documents are read and checked in a process
+pool and one JSON line is streamed per document as soon as it finishes.
+"""
+
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+from compliance_checker import iter_requirements, analyze_compliance
+from extract_content import collect_documents, read_document
+from requirement_store import RequirementStore
+
+# Recycle workers periodically so long batches do not accumulate memory
+TASKS_PER_WORKER = 100
+
+_requirements = None
+_min_score = None
+_use_cache = True
+
+
+def _init_worker(requirements, min_score, use_cache=True):
+    global _requirements, _min_score, _use_cache
+    _requirements = requirements
+    _min_score = min_score
+    _use_cache = use_cache
+
+
+def summarize_results(results):
+    """Reduce analyze_compliance results to a compact, JSON-ready summary."""
+    return {
+        'total': results['total'],
+        'found': results['found'],
+        'missing': results['missing'],
+        'by_category': {
+            category: {
+                'total': cat_data['total'],
+                'found': cat_data['found'],
+                'missing': cat_data['missing'],
+                'missing_requirements': [req['requirement'] for req in cat_data['requirements']]
+            }
+            for category, cat_data in results['by_category'].items()
+        }
+    }
+
+
+def check_document(document_path):
+    """Check one document against the worker's requirements."""
+    start = time.perf_counter()
+    try:
+        content = read_document(document_path, _use_cache)
+    except Exception as e:
+        return {'document': str(document_path), 'error': str(e)}
+
+    # The store's results are reset for every document it is checked against
+    results = analyze_compliance(_requirements, content, _min_score)
+
+    summary = {'document': str(document_path), 'characters': len(content)}
+    summary.update(summarize_results(results))
+    summary['seconds'] = round(time.perf_counter() - start, 3)
+    return summary
+
+
+def check_documents(document_paths, requirements, workers=None, min_score=None, use_cache=True):
+    """
+    Check documents in a process pool sized to the machine's cores.
+    A RequirementStore is the cheapest requirement form to ship to workers.
+    Yields one summary per document in completion order. Workers read their
+    own documents, so memory stays bounded by the pool size, not the batch.
+    """
+    workers = workers or os.cpu_count() or 1
+    with Pool(workers, initializer=_init_worker, initargs=(requirements, min_score, use_cache),
+              maxtasksperchild=TASKS_PER_WORKER) as pool:
+        for result in pool.imap_unordered(check_document, [str(p) for p in document_paths]):
+            yield result
+
+
+def main():
+    """
+    Usage: python batch_compliance.py <requirements_file> <document_or_dir>...
+                                      [--output PATH] [--workers N] [--min-score X]
+                                      [--no-cache]
+    """
+    args = sys.argv[1:]
+    use_cache = '--no-cache' not in args
+    if not use_cache:
+        args.remove('--no-cache')
+    options = {}
+    for flag in ('--output', '--workers', '--min-score'):
+        if flag in args:
+            idx = args.index(flag)
+            if idx + 1 < len(args):
+                options[flag] = args[idx + 1]
+                del args[idx:idx + 2]
+
+    if len(args) < 2:
+        print("Usage: python batch_compliance.py <requirements_file> <document_or_dir>... [options]")
+        print("\nOptions:")
+        print("  --output PATH    write JSON lines to PATH (default: stdout)")
+        print("  --workers N      worker processes (default: CPU count)")
+        print("  --min-score X    use BM25 scoring with threshold X")
+        print("  --no-cache       re-extract documents instead of using the extraction cache")
+        sys.exit(1)
+
+    with open(args[0], 'r', encoding='utf-8') as f:
+        requirements = RequirementStore.from_requirements(iter_requirements(f))
+
+    documents = collect_documents(args[1:])
+    if not documents:
+        print("Error: No supported documents found", file=sys.stderr)
+        sys.exit(1)
+
+    workers = int(options['--workers']) if '--workers' in options else None
+    min_score = float(options['--min-score']) if '--min-score' in options else None
+
+    print(f"Checking {len(documents)} document(s) against {len(requirements)} requirements",
+          file=sys.stderr)
+
+    out = open(options['--output'], 'w', encoding='utf-8') if '--output' in options else sys.stdout
+    failed = 0
+    try:
+        for result in check_documents(documents, requirements, workers, min_score, use_cache):
+            if 'error' in result:
+                failed += 1
+            out.write(json.dumps(result) + '\n')
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(f"Done: {len(documents) - failed} checked, {failed} failed", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
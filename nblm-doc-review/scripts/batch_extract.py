@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Batch text extraction of whole document repositories to JSON lines.
+Documents are extracted in a process pool and one record per file is
+streamed to the output as soon as it finishes. A state file remembers each
+file's mtime and size, so files unchanged since the last run are copied
+over from the previous output instead of being extracted again.
+"""
+
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+from extract_content import collect_documents, read_document
+
+STATE_VERSION = 1
+
+# Recycle workers periodically so long batches do not accumulate memory
+TASKS_PER_WORKER = 100
+
+_use_cache = True
+
+
+def _init_worker(use_cache):
+    global _use_cache
+    _use_cache = use_cache
+
+
+def file_signature(path):
+    """Return [mtime_ns, size] identifying the current version of a file."""
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def extract_file(document_path):
+    """
+    Extract one document in a worker.
+    Returns (signature, record); the signature is taken before reading so
+    a file modified mid-extraction is picked up again on the next run.
+    """
+    start = time.perf_counter()
+    record = {'document': document_path}
+    try:
+        signature = file_signature(document_path)
+        text = read_document(document_path, _use_cache)
+    except Exception as e:
+        record['error'] = str(e)
+        return None, record
+
+    record['bytes'] = signature[1]
+    record['mtime'] = signature[0] / 1e9
+    record['characters'] = len(text)
+    record['seconds'] = round(time.perf_counter() - start, 3)
+    record['text'] = text
+    return signature, record
+
+
+def load_state(state_path):
+    """Load {document: {'signature', 'offset', 'length'}} from a previous run."""
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            state = json.loads(f.read())
+    except (OSError, ValueError):
+        return {}
+    if state.get('version') != STATE_VERSION:
+        return {}
+    return state.get('files', {})
+
+
+def save_state(state_path, files):
+    """Write the state file atomically."""
+    tmp_path = f"{state_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'version': STATE_VERSION, 'files': files}))
+    os.replace(tmp_path, state_path)
+
+
+def extract_batch(document_paths, output_path, state_path, workers=None,
+                  use_cache=True, force=False):
+    """
+    Write one JSON line per document to output_path.
+    Records of files whose mtime and size match the state file are copied
+    from the previous output; the rest are extracted in a process pool and
+    written as they finish. The output is replaced only once complete.
+    Returns counts of 'extracted', 'unchanged' and 'failed' documents.
+    """
+    previous = {} if force else load_state(state_path)
+    if not os.path.exists(output_path):
+        previous = {}
+
+    files = {}
+    counts = {'extracted': 0, 'unchanged': 0, 'failed': 0}
+    tmp_path = f"{output_path}.tmp"
+
+    def write(out, document, line, signature):
+        offset = out.tell()
+        out.write(line)
+        if signature is not None:
+            files[document] = {'signature': signature, 'offset': offset, 'length': len(line)}
+
+    old_output = open(output_path, 'rb') if previous else None
+    try:
+        with open(tmp_path, 'wb') as out:
+            pending = []
+            for path in document_paths:
+                document = str(path)
+                entry = previous.get(document)
+                try:
+                    signature = file_signature(document)
+                except OSError:
+                    signature = None
+
+                if entry and signature == entry['signature']:
+                    old_output.seek(entry['offset'])
+                    line = old_output.read(entry['length'])
+                    # Guard against an output edited since the state was saved
+                    prefix = json.dumps({'document': document})[:-1].encode('utf-8')
+                    if line.startswith(prefix) and line.endswith(b'\n'):
+                        write(out, document, line, signature)
+                        counts['unchanged'] += 1
+                        continue
+                pending.append(document)
+
+            if pending:
+                workers = min(workers or os.cpu_count() or 1, len(pending))
+                with Pool(workers, initializer=_init_worker, initargs=(use_cache,),
+                          maxtasksperchild=TASKS_PER_WORKER) as pool:
+                    for signature, record in pool.imap_unordered(extract_file, pending):
+                        if 'error' in record:
+                            counts['failed'] += 1
+                        else:
+                            counts['extracted'] += 1
+                        line = (json.dumps(record) + '\n').encode('utf-8')
+                        write(out, record['document'], line, signature)
+    finally:
+        if old_output is not None:
+            old_output.close()
+
+    os.replace(tmp_path, output_path)
+    save_state(state_path, files)
+    return counts
+
+
+def main():
+    """
+    Usage: python batch_extract.py <output.jsonl> <document_dir_or_glob>...
+                                   [--workers N] [--state PATH] [--force] [--no-cache]
+    """
+    args = sys.argv[1:]
+    options = {}
+    for flag in ('--workers', '--state'):
+        if flag in args:
+            idx = args.index(flag)
+            if idx + 1 < len(args):
+                options[flag] = args[idx + 1]
+                del args[idx:idx + 2]
+    for flag in ('--force', '--no-cache'):
+        if flag in args:
+            options[flag] = True
+            args.remove(flag)
+
+    if len(args) < 2:
+        print("Usage: python batch_extract.py <output.jsonl> <document_dir_or_glob>... [options]")
+        print("\nOptions:")
+        print("  --workers N     worker processes (default: CPU count)")
+        print("  --state PATH    mtime/size state file (default: <output>.state.json)")
+        print("  --force         re-extract every file, ignoring the state file")
+        print("  --no-cache      bypass the extraction cache")
+        sys.exit(1)
+
+    output_path = args[0]
+    documents = collect_documents(args[1:])
+    if not documents:
+        print("Error: No supported documents found", file=sys.stderr)
+        sys.exit(1)
+
+    workers = int(options['--workers']) if '--workers' in options else None
+    state_path = options.get('--state', f"{output_path}.state.json")
+
+    print(f"Extracting {len(documents)} document(s) to {output_path}", file=sys.stderr)
+    start = time.perf_counter()
+    counts = extract_batch(documents, output_path, state_path, workers,
+                           use_cache='--no-cache' not in options,
+                           force='--force' in options)
+
+    print(f"Done in {time.perf_counter() - start:.1f}s: {counts['extracted']} extracted, "
+          f"{counts['unchanged']} unchanged, {counts['failed']} failed", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Batch review of many documents against NotebookLM notebooks.
+Each document is extracted once, for both notebook selection and analysis;
+every notebook any document needs is queried once, and each answer's
+requirements are parsed once and shared by all documents. Documents are
+analyzed in a process pool; one report is written per document plus a
+portfolio summary.
+"""
+
+import os
+import sys
+import time
+from datetime import datetime
+from multiprocessing import Pool
+from pathlib import Path
+
+from answer_cache import DEFAULT_TTL, AnswerCache
+from compliance_checker import ReportWriter
+from extract_content import collect_documents
+from notebooklm_worker import WorkerPool
+from pipeline import analyze_stores, extract_document, parse_answer, select_relevant_notebooks
+from review_document import (
+    DEFAULT_MAX_PARALLEL,
+    DEFAULT_QUERY_TIMEOUT,
+    QUESTIONS,
+    query_notebooks,
+    resolve_notebooklm_skill_dir,
+    write_report
+)
+
+# Recycle workers periodically so long batches do not accumulate memory
+TASKS_PER_WORKER = 100
+
+SUMMARY_FILE = 'portfolio_summary.md'
+
+_threshold = 5
+_top_k = None
+_use_cache = True
+_queries = None
+_stores = None
+_output_options = None
+
+
+def _init_selector(threshold, top_k, use_cache):
+    global _threshold, _top_k, _use_cache
+    _threshold = threshold
+    _top_k = top_k
+    _use_cache = use_cache
+
+
+def _init_reviewer(queries, stores, output_options):
+    global _queries, _stores, _output_options
+    _queries = queries
+    _stores = stores
+    _output_options = output_options
+
+
+def select_document(document_path):
+    """
+    Extract one document and select its notebooks, in a worker. The text
+    is returned with the selection so analysis does not extract it again.
+    """
+    content, error = extract_document(document_path, _use_cache)
+    if error:
+        return {'document': document_path, 'error': error}
+
+    selection, error = select_relevant_notebooks(content, _threshold, top_k=_top_k)
+    if error:
+        return {'document': document_path, 'error': error}
+    return {
+        'document': document_path,
+        'characters': len(content),
+        'content': content,
+        'keywords': selection['keywords'],
+        'notebooks': selection['notebooks']
+    }
+
+
+def review_one(task):
+    """
+    Analyze one document against its notebooks' shared requirement stores
+    and write its report, in a worker. The report is written before the
+    next document reuses the stores.
+    """
+    document_path, content, notebooks, report_path = task
+    start = time.perf_counter()
+
+    # Like review_document, the report lists every selected notebook but
+    # only the answered ones contribute requirements
+    answered = [nb['id'] for nb in notebooks if nb['id'] in _queries]
+    queries = [_queries[notebook_id] for notebook_id in answered]
+    results = analyze_stores([_stores[notebook_id] for notebook_id in answered], content)
+    with open(report_path, 'w', encoding='utf-8') as f:
+        write_report(ReportWriter(f), document_path, content, notebooks, queries,
+                     _output_options, results)
+
+    return {
+        'document': document_path,
+        'report': report_path,
+        'notebooks': [_queries[notebook_id]['notebook_name'] for notebook_id in answered],
+        'total': results['total'] if results else 0,
+        'found': results['found'] if results else 0,
+        'missing': results['missing'] if results else 0,
+        'seconds': round(time.perf_counter() - start, 3)
+    }
+
+
+def report_paths(document_paths, output_dir):
+    """Report file per document, numbering documents that share a file name."""
+    paths = []
+    used = set()
+    for document_path in document_paths:
+        stem = Path(document_path).stem
+        name = f"{stem}_alignment_report.md"
+        counter = 2
+        while name in used:
+            name = f"{stem}_{counter}_alignment_report.md"
+            counter += 1
+        used.add(name)
+        paths.append(str(Path(output_dir) / name))
+    return paths
+
+
+def write_portfolio_summary(report, reviews, failures, notebooks, document_counts, notebook_errors):
+    """Append the portfolio summary to report, a list of lines or a ReportWriter."""
+    total = sum(review['total'] for review in reviews)
+    found = sum(review['found'] for review in reviews)
+
+    report.append("# Portfolio Compliance Summary")
+    report.append(f"\n**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    report.append(f"**Documents Reviewed:** {len(reviews)}")
+    report.append(f"**Documents Failed:** {len(failures)}")
+    report.append(f"**Notebooks Queried:** {len(notebooks) - len(notebook_errors)} of {len(notebooks)}")
+    if total:
+        report.append(f"**Overall Coverage:** {found}/{total} requirements ({100 * found / total:.0f}%)")
+    report.append("\n---\n")
+
+    report.append("## Documents\n")
+    report.append("| Document | Notebooks | Requirements | Covered | Missing | Coverage | Report |")
+    report.append("|---|---|---|---|---|---|---|")
+    for review in reviews:
+        coverage = f"{100 * review['found'] / review['total']:.0f}%" if review['total'] else '-'
+        report.append(
+            f"| {review['document']} | {len(review['notebooks'])} | {review['total']} | "
+            f"{review['found']} | {review['missing']} | {coverage} | {Path(review['report']).name} |")
+
+    report.append("\n## Notebooks\n")
+    report.append("| Notebook | Documents | Status |")
+    report.append("|---|---|---|")
+    for nb in notebooks:
+        status = notebook_errors.get(nb['id'], 'answered')
+        report.append(f"| {nb['name']} | {document_counts[nb['id']]} | {status} |")
+
+    if failures:
+        report.append("\n## Failed Documents\n")
+        for failure in failures:
+            report.append(f"- **{failure['document']}:** {failure['error']}")
+
+
+def main():
+    """
+    Usage: python batch_review.py <document_dir_or_glob>... [--output-dir DIR]
+                                  [--output gap,alignment,recommendations,all]
+                                  [--depth quick|detailed] [--threshold N] [--top-k N]
+                                  [--workers N] [--max-parallel N] [--query-timeout SECONDS]
+                                  [--worker] [--no-cache] [--no-answer-cache] [--answer-ttl HOURS]
+    """
+    args = sys.argv[1:]
+    options = {}
+    for flag in ('--output-dir', '--output', '--depth', '--threshold', '--top-k', '--workers',
+                 '--max-parallel', '--query-timeout', '--answer-ttl'):
+        if flag in args:
+            idx = args.index(flag)
+            if idx + 1 < len(args):
+                options[flag] = args[idx + 1]
+                del args[idx:idx + 2]
+    for flag in ('--worker', '--no-cache', '--no-answer-cache'):
+        if flag in args:
+            options[flag] = True
+            args.remove(flag)
+
+    if not args:
+        print("Usage: python batch_review.py <document_dir_or_glob>... [options]")
+        print("\nOptions:")
+        print("  --output-dir DIR  reports and portfolio summary (default: review_reports)")
+        print("  --output gap,alignment,recommendations,all  (default: all)")
+        print("  --depth quick|detailed  (default: detailed)")
+        print("  --threshold N     notebook relevance threshold (default: 5)")
+        print("  --top-k N         use at most the N most relevant notebooks per document")
+        print("  --workers N       processes for extraction and analysis (default: CPU count)")
+        print(f"  --max-parallel N  notebooks queried at once (default: {DEFAULT_MAX_PARALLEL})")
+        print(f"  --query-timeout SECONDS  kill a notebook query after this long (default: {DEFAULT_QUERY_TIMEOUT})")
+        print("  --worker          ask questions through long-lived NotebookLM workers")
+        print("  --no-cache        re-extract documents instead of using the extraction cache")
+        print("  --no-answer-cache ask every notebook again instead of reusing cached answers")
+        print(f"  --answer-ttl HOURS  reuse cached answers up to this old (default: {DEFAULT_TTL // 3600})")
+        sys.exit(1)
+
+    output_dir = options.get('--output-dir', 'review_reports')
+    output_options = options.get('--output', 'all').split(',')
+    depth = options.get('--depth', 'detailed')
+    threshold = int(options.get('--threshold', 5))
+    top_k = int(options['--top-k']) if '--top-k' in options else None
+    workers = int(options['--workers']) if '--workers' in options else os.cpu_count() or 1
+    max_parallel = int(options.get('--max-parallel', DEFAULT_MAX_PARALLEL))
+    query_timeout = float(options.get('--query-timeout', DEFAULT_QUERY_TIMEOUT)) or None
+    answer_ttl = float(options['--answer-ttl']) * 3600 if '--answer-ttl' in options else DEFAULT_TTL
+    use_cache = '--no-cache' not in options
+
+    documents = [str(path) for path in collect_documents(args)]
+    if not documents:
+        print("Error: No supported documents found", file=sys.stderr)
+        sys.exit(1)
+
+    # Step 1: Extract documents and select notebooks for each
+    print(f"1️⃣  Selecting notebooks for {len(documents)} document(s)...")
+    selections = []
+    with Pool(min(workers, len(documents)), initializer=_init_selector,
+              initargs=(threshold, top_k, use_cache), maxtasksperchild=TASKS_PER_WORKER) as pool:
+        for selection in pool.imap(select_document, documents):
+            selections.append(selection)
+
+    failures = [selection for selection in selections if 'error' in selection]
+    failures += [
+        {'document': selection['document'], 'error': 'No relevant notebooks found'}
+        for selection in selections if 'error' not in selection and not selection['notebooks']
+    ]
+
+    for failure in failures:
+        print(f"   ⚠️  {failure['document']}: {failure['error']}")
+
+    # The union of notebooks, in order of first use; scores stay per document
+    notebooks = {}
+    document_counts = {}
+    for selection in selections:
+        for nb in selection.get('notebooks', []):
+            notebooks.setdefault(nb['id'], nb)
+            document_counts[nb['id']] = document_counts.get(nb['id'], 0) + 1
+    notebooks = list(notebooks.values())
+
+    if not notebooks:
+        print("❌ No relevant notebooks found for any document. Try lowering the threshold.")
+        sys.exit(1)
+    print(f"✅ {len(documents) - len(failures)} document(s) need {len(notebooks)} distinct notebook(s)\n")
+
+    # Step 2: Query each notebook once
+    print("2️⃣  Querying notebooks for requirements...")
+    question = QUESTIONS['quick'] if depth == 'quick' else QUESTIONS['detailed']
+    answer_cache = None if '--no-answer-cache' in options else AnswerCache(ttl=answer_ttl)
+    notebook_workers = None
+    if '--worker' in options:
+        skill_dir, error = resolve_notebooklm_skill_dir()
+        if error:
+            print(f"❌ {error}")
+            sys.exit(1)
+        notebook_workers = WorkerPool(skill_dir)
+
+    def report_progress(nb, answer, error):
+        if error:
+            print(f"   ⚠️  Warning: {nb['name']}: {error}")
+        else:
+            print(f"   ✅ {nb['name']}: received response ({len(answer)} chars)")
+
+    try:
+        answers = query_notebooks(notebooks, question, max_parallel, query_timeout,
+                                  report_progress, answer_cache, notebook_workers)
+    except KeyboardInterrupt:
+        print("\n❌ Cancelled; stopped all notebook queries")
+        sys.exit(130)
+    finally:
+        if notebook_workers is not None:
+            notebook_workers.close()
+    if answer_cache is not None and answer_cache.cache_dir is not None:
+        print(f"   Answer cache: {answer_cache.summary()}")
+
+    queries = {}
+    notebook_errors = {}
+    for nb, (answer, error) in zip(notebooks, answers):
+        if error:
+            notebook_errors[nb['id']] = error
+            continue
+        queries[nb['id']] = {
+            'notebook_name': nb['name'],
+            'notebook_id': nb['id'],
+            'question': question,
+            'answer': answer
+        }
+    if not queries:
+        print("❌ Failed to query any notebooks")
+        sys.exit(1)
+
+    # Parse every answer once; workers receive the parsed stores
+    stores = {notebook_id: parse_answer(query['answer']) for notebook_id, query in queries.items()}
+    print(f"✅ Parsed {sum(len(store) for store in stores.values())} requirements "
+          f"from {len(stores)} notebook(s)\n")
+
+    # Step 3: Analyze every document and write its report
+    print("3️⃣  Analyzing documents...")
+    os.makedirs(output_dir, exist_ok=True)
+    tasks = []
+    selected = [selection for selection in selections if selection.get('notebooks')]
+    for selection, report_path in zip(selected, report_paths([s['document'] for s in selected], output_dir)):
+        if any(nb['id'] in queries for nb in selection['notebooks']):
+            tasks.append((selection['document'], selection['content'], selection['notebooks'], report_path))
+        else:
+            failures.append({'document': selection['document'],
+                             'error': 'None of its notebooks could be queried'})
+
+    reviews = []
+    if tasks:
+        with Pool(min(workers, len(tasks)), initializer=_init_reviewer,
+                  initargs=(queries, stores, output_options),
+                  maxtasksperchild=TASKS_PER_WORKER) as pool:
+            for review in pool.imap(review_one, tasks):
+                if 'error' in review:
+                    failures.append(review)
+                    print(f"   ⚠️  {review['document']}: {review['error']}")
+                    continue
+                reviews.append(review)
+                print(f"   ✅ {review['document']}: {review['found']}/{review['total']} requirements covered")
+
+    # Step 4: Portfolio summary
+    summary_path = Path(output_dir) / SUMMARY_FILE
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        write_portfolio_summary(ReportWriter(f), reviews, failures, notebooks, document_counts,
+                                notebook_errors)
+    print(f"\n✅ {len(reviews)} report(s) and portfolio summary written to {output_dir}")
+    if failures:
+        print(f"⚠️  {len(failures)} document(s) failed; see {summary_path}")
+
+
+if __name__ == '__main__':
+    main()
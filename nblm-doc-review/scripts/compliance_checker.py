@@ -4,23 +4,37 @@ Compliance Checker - Verify document compliance against NotebookLM requirements.
 Simple approach: Check if each requirement is mentioned/addressed in the document.
 """
 
+import io
+import json
 import re
 import sys
+from itertools import islice
 
+from document_index import DocumentIndex
+from relevance_scorer import BM25Scorer
+from requirement_store import RequirementStore
 
-def parse_requirements(notebook_response):
+# Default BM25 coverage threshold when scores are requested without one
+DEFAULT_MIN_SCORE = 0.35
+
+# Requirements checked per batch when analyzing a stream of requirements
+STREAM_BATCH_SIZE = 4096
+
+CATEGORY_PATTERN = re.compile(r'^(\d+)\.\s+(.+)')
+BULLET_PATTERN = re.compile(r'^[•◦]\s+(.+)')
+
+
+def iter_requirements(source):
     """
-    Parse requirements from NotebookLM response.
+    Parse requirements from NotebookLM response incrementally.
+    source may be the response text, an open file, or any iterable of lines;
+    requirements are yielded as soon as their bullet line is read.
     Looks for numbered lists, bullet points, and requirement patterns.
-    Returns list of requirement dictionaries.
+    Yields requirement dictionaries.
     """
-    requirements = []
-
-    # Split into lines
-    lines = notebook_response.split('\n')
+    lines = io.StringIO(source) if isinstance(source, str) else source
 
     current_category = None
-    current_requirement = None
 
     for line in lines:
         line = line.strip()
@@ -28,25 +42,31 @@ def parse_requirements(notebook_response):
             continue
 
         # Detect category headers (e.g., "1. Governance and Internal Controls")
-        category_match = re.match(r'^(\d+)\.\s+(.+)', line)
+        category_match = CATEGORY_PATTERN.match(line)
         if category_match and len(line) < 100:  # Categories are typically short
             current_category = category_match.group(2).strip()
             continue
 
         # Detect requirement bullets (• or ◦)
-        bullet_match = re.match(r'^[•◦]\s+(.+)', line)
+        bullet_match = BULLET_PATTERN.match(line)
         if bullet_match:
             req_text = bullet_match.group(1).strip()
             if len(req_text) > 20:  # Filter out very short items
-                requirements.append({
+                yield {
                     'category': current_category or 'General',
                     'requirement': req_text,
                     'found': False,
                     'evidence': []
-                })
+                }
             continue
 
-    return requirements
+
+def parse_requirements(notebook_response):
+    """
+    Parse requirements from NotebookLM response.
+    Returns list of requirement dictionaries.
+    """
+    return list(iter_requirements(notebook_response))
 
 
 def extract_keywords(requirement_text):
@@ -69,17 +89,28 @@ def extract_keywords(requirement_text):
     return keywords[:10]
 
 
-def check_requirement(requirement, document_content):
+def check_requirement(requirement, document):
     """
     Check if a requirement is addressed in the document.
+    Accepts document text or a prebuilt DocumentIndex.
     Returns True if found, along with evidence snippets.
     """
     req_text = requirement['requirement'].lower()
-    doc_lower = document_content.lower()
+    index = document if isinstance(document, DocumentIndex) else DocumentIndex(document)
 
     # Extract keywords from requirement
     keywords = extract_keywords(req_text)
 
+    return evaluate_keywords(keywords, index.contains, index.evidence_window)
+
+
+def evaluate_keywords(keywords, contains, evidence_for):
+    """
+    Apply the keyword-overlap rule to a requirement's keywords.
+    contains(keyword) reports presence in the document; evidence_for(keyword)
+    returns a snippet around its first occurrence, or None.
+    Returns True if found, along with evidence snippets.
+    """
     if not keywords:
         return False, []
 
@@ -88,17 +119,13 @@ def check_requirement(requirement, document_content):
     evidence = []
 
     for keyword in keywords[:5]:  # Check top 5 keywords
-        if keyword in doc_lower:
+        if contains(keyword):
             matches += 1
 
-            # Find context around keyword
-            pattern = r'.{0,100}\b' + re.escape(keyword) + r'\b.{0,100}'
-            context_matches = re.finditer(pattern, doc_lower, re.IGNORECASE)
-
-            for match in list(context_matches)[:1]:  # Take first occurrence
-                snippet = match.group(0).strip()
-                if snippet not in evidence:
-                    evidence.append(snippet[:150])  # Limit snippet length
+            # Find context around first occurrence of keyword
+            snippet = evidence_for(keyword)
+            if snippet and snippet not in evidence:
+                evidence.append(snippet)
 
     # Consider "found" if at least 40% of top keywords are present
     threshold = max(2, len(keywords[:5]) * 0.4)
@@ -107,52 +134,139 @@ def check_requirement(requirement, document_content):
     return found, evidence
 
 
-def analyze_compliance(requirements, document_content):
-    """
-    Analyze document compliance against all requirements.
-    Returns categorized results.
-    """
-    results = {
-        'total': len(requirements),
+def new_results(total):
+    """Create an empty results structure for analyze_compliance."""
+    return {
+        'total': total,
         'found': 0,
         'missing': 0,
         'by_category': {}
     }
 
-    for req in requirements:
-        found, evidence = check_requirement(req, document_content)
-        req['found'] = found
-        req['evidence'] = evidence
 
-        if found:
-            results['found'] += 1
-        else:
-            results['missing'] += 1
-
-        # Group by category
-        category = req['category']
-        if category not in results['by_category']:
-            results['by_category'][category] = {
-                'total': 0,
-                'found': 0,
-                'missing': 0,
-                'requirements': []
-            }
-
-        results['by_category'][category]['total'] += 1
-        if found:
-            results['by_category'][category]['found'] += 1
+def record_result(results, req):
+    """Count a checked requirement (with 'found' set) into results."""
+    found = req['found']
+    if found:
+        results['found'] += 1
+    else:
+        results['missing'] += 1
+
+    # Group by category
+    category = req['category']
+    if category not in results['by_category']:
+        results['by_category'][category] = {
+            'total': 0,
+            'found': 0,
+            'missing': 0,
+            'requirements': []
+        }
+
+    results['by_category'][category]['total'] += 1
+    if found:
+        results['by_category'][category]['found'] += 1
+    else:
+        results['by_category'][category]['missing'] += 1
+        results['by_category'][category]['requirements'].append(req)
+
+
+def analyze_compliance(requirements, document_content, min_score=None):
+    """
+    Analyze document compliance against all requirements.
+    Accepts document text or a prebuilt DocumentIndex.
+    Requirements may be a list of dicts, a RequirementStore, or an iterator
+    such as iter_requirements(); iterators are checked in batches as they
+    are read, and only missing requirements are kept in the results.
+    A store records results in its arrays, with evidence kept as document
+    offsets, and results refer to its requirements by index.
+    With min_score set, requirements are scored with BM25 against document
+    passages instead of keyword overlap; each requirement then records its
+    'score' and the best passage as evidence.
+    Returns categorized results.
+    """
+    results = new_results(0)
+    compact = isinstance(requirements, RequirementStore)
+
+    # Index the document once and reuse it for every requirement
+    if isinstance(document_content, DocumentIndex):
+        index = document_content
+    else:
+        index = DocumentIndex(document_content)
+    scorer = BM25Scorer(index) if min_score is not None else None
+
+    if compact:
+        requirements.begin_results(index.text, scored=scorer is not None)
+
+    if isinstance(requirements, (list, tuple, RequirementStore)):
+        batches = [requirements]
+    else:
+        batches = iter(lambda: list(islice(requirements, STREAM_BATCH_SIZE)), [])
+
+    for batch in batches:
+        if scorer is not None:
+            scored = scorer.score_requirements(batch)
         else:
-            results['by_category'][category]['missing'] += 1
-            results['by_category'][category]['requirements'].append(req)
+            scored = None
+
+            # Match the keywords of the whole batch in a single pass; presence
+            # is then read from the scan instead of searching per requirement
+            batch_keywords = [extract_keywords(req['requirement'].lower()) for req in batch]
+            hits = index.scan_keywords(set(k for keywords in batch_keywords for k in keywords[:5]))
+
+            def present(keyword):
+                return hits[keyword][0] > 0
+
+            evidence_for = index.evidence_offsets if compact else index.evidence_window
+
+        for i, req in enumerate(batch):
+            score = None
+            if scored is not None:
+                score = scored[i]['score']
+                found = score >= min_score
+                passage_id = scored[i]['passage_id']
+                if passage_id is None:
+                    evidence = []
+                elif compact:
+                    evidence = [scorer.passage_span(passage_id, limit=150)]
+                else:
+                    evidence = [scored[i]['passage']]
+            else:
+                found, evidence = evaluate_keywords(batch_keywords[i], present, evidence_for)
+
+            if compact:
+                requirements.record(req.index, found, evidence, score)
+            else:
+                if score is not None:
+                    req['score'] = score
+                req['found'] = found
+                req['evidence'] = evidence
+            record_result(results, req)
+
+        results['total'] += len(batch)
 
     return results
 
 
-def generate_gap_report(results):
-    """Generate gap analysis report text."""
-    report = []
+class ReportWriter:
+    """
+    Line sink that writes report lines straight to a file handle.
+    Output is identical to '\n'.join() over the same lines, so the
+    write_* functions accept either a list or a ReportWriter.
+    """
+
+    def __init__(self, out):
+        self.out = out
+        self.started = False
 
+    def append(self, line):
+        if self.started:
+            self.out.write('\n')
+        self.out.write(line)
+        self.started = True
+
+
+def write_gap_report(results, report):
+    """Append gap analysis report lines to report (a list or ReportWriter)."""
     report.append("## Gap Analysis\n")
     report.append(f"**Total Requirements Checked:** {results['total']}")
     report.append(f"**Requirements Covered:** {results['found']}")
@@ -160,7 +274,7 @@ def generate_gap_report(results):
 
     if results['missing'] == 0:
         report.append("✅ **Excellent!** Your document appears to cover all identified requirements.\n")
-        return '\n'.join(report)
+        return
 
     report.append("### Missing or Inadequate Requirements\n")
 
@@ -180,13 +294,17 @@ def generate_gap_report(results):
                 report.append(f"- **{req_text}**")
 
     report.append("\n")
-    return '\n'.join(report)
 
 
-def generate_recommendations(results):
-    """Generate specific recommendations for missing requirements."""
+def generate_gap_report(results):
+    """Generate gap analysis report text."""
     report = []
+    write_gap_report(results, report)
+    return '\n'.join(report)
+
 
+def write_recommendations(results, report):
+    """Append recommendation lines to report (a list or ReportWriter)."""
     report.append("## Recommendations\n")
 
     if results['missing'] == 0:
@@ -194,7 +312,7 @@ def generate_recommendations(results):
         report.append("1. Reviewing the requirements in detail to ensure adequate depth of coverage")
         report.append("2. Keeping the document updated as regulations evolve")
         report.append("3. Regular compliance audits\n")
-        return '\n'.join(report)
+        return
 
     report.append("### Priority Actions\n")
 
@@ -215,6 +333,12 @@ def generate_recommendations(results):
                 priority_num += 1
 
     report.append("\n")
+
+
+def generate_recommendations(results):
+    """Generate specific recommendations for missing requirements."""
+    report = []
+    write_recommendations(results, report)
     return '\n'.join(report)
 
 
@@ -222,33 +346,77 @@ def main():
     """
     Main function for testing compliance checker.
     Usage: python compliance_checker.py <document_file> <requirements_file>
+                                        [--min-score X] [--scores-out PATH] [--cache PATH]
     """
     if len(sys.argv) < 3:
-        print("Usage: python compliance_checker.py <document_file> <requirements_file>")
+        print("Usage: python compliance_checker.py <document_file> <requirements_file> [options]")
+        print("\nOptions:")
+        print("  --min-score X     score requirements with BM25, found if score >= X (0-1)")
+        print(f"  --scores-out PATH write per-requirement BM25 scores as JSON lines (default threshold {DEFAULT_MIN_SCORE})")
+        print("  --cache PATH      reuse per-section results cached at PATH (keyword mode only)")
         sys.exit(1)
 
     document_file = sys.argv[1]
     requirements_file = sys.argv[2]
+    min_score = None
+    scores_out = None
+    cache_path = None
+
+    if '--min-score' in sys.argv:
+        idx = sys.argv.index('--min-score')
+        if idx + 1 < len(sys.argv):
+            min_score = float(sys.argv[idx + 1])
+
+    if '--scores-out' in sys.argv:
+        idx = sys.argv.index('--scores-out')
+        if idx + 1 < len(sys.argv):
+            scores_out = sys.argv[idx + 1]
+            if min_score is None:
+                min_score = DEFAULT_MIN_SCORE
+
+    if '--cache' in sys.argv:
+        idx = sys.argv.index('--cache')
+        if idx + 1 < len(sys.argv):
+            cache_path = sys.argv[idx + 1]
+
+    if cache_path and min_score is not None:
+        print("Error: --cache works with keyword matching only, not BM25 scoring")
+        sys.exit(1)
 
     # Read files
     with open(document_file, 'r', encoding='utf-8') as f:
         document_content = f.read()
 
     with open(requirements_file, 'r', encoding='utf-8') as f:
-        requirements_text = f.read()
-
-    # Parse and analyze
-    requirements = parse_requirements(requirements_text)
-    print(f"Parsed {len(requirements)} requirements")
-
-    results = analyze_compliance(requirements, document_content)
-
-    # Generate reports
-    gap_report = generate_gap_report(results)
-    recommendations = generate_recommendations(results)
-
-    print(gap_report)
-    print(recommendations)
+        if cache_path:
+            from section_cache import analyze_incremental
+            requirements = parse_requirements(f.read())
+            print(f"Parsed {len(requirements)} requirements")
+            results = analyze_incremental(requirements, document_content, cache_path)
+            print(f"Re-checked {results['sections']['rechecked']} of {results['sections']['total']} sections")
+        elif scores_out:
+            requirements = parse_requirements(f.read())
+            print(f"Parsed {len(requirements)} requirements")
+            results = analyze_compliance(requirements, document_content, min_score)
+            with open(scores_out, 'w', encoding='utf-8') as out:
+                for req in requirements:
+                    out.write(json.dumps({
+                        'category': req['category'],
+                        'requirement': req['requirement'],
+                        'score': req['score'],
+                        'passage': req['evidence'][0] if req['evidence'] else None
+                    }) + '\n')
+            print(f"Wrote scores to {scores_out}")
+        else:
+            # Stream requirements straight from the file into the checker
+            results = analyze_compliance(iter_requirements(f), document_content, min_score)
+            print(f"Parsed {results['total']} requirements")
+
+    # Stream reports to stdout as they are produced
+    write_gap_report(results, ReportWriter(sys.stdout))
+    print()
+    write_recommendations(results, ReportWriter(sys.stdout))
+    print()
 
 
 if __name__ == '__main__':
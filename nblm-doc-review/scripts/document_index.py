@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Document index for compliance checking.
+Built once per document so keyword lookups and evidence windows
+do not rescan the full text for every requirement.
+"""
+
+import re
+
+from evidence import evidence_snippet, evidence_span
+from keyword_matcher import KeywordMatcher
+
+WORD_PATTERN = re.compile(r'\w+')
+
+
+class DocumentIndex:
+    """Token positions and line offsets for a lowercased document."""
+
+    def __init__(self, document_content):
+        self.text = document_content.lower()
+
+        # Every word token (a maximal \w run) mapped to its start offsets
+        self.positions = {}
+        for match in WORD_PATTERN.finditer(self.text):
+            self.positions.setdefault(match.group(0), []).append(match.start())
+
+        # Start offset of every line
+        self.line_starts = [0]
+        self.line_starts.extend(m.end() for m in re.finditer('\n', self.text))
+
+        # keyword -> (hit_count, first_offset), filled by scan_keywords
+        self.hits = {}
+
+        self._vocabulary_text = None
+        self._presence = {}
+
+    def contains(self, keyword):
+        """
+        Check if keyword appears anywhere in the document (substring match).
+        Word keywords are resolved against the token vocabulary and memoized.
+        """
+        if keyword in self.positions:
+            return True
+
+        hit = self.hits.get(keyword)
+        if hit is not None:
+            return hit[0] > 0
+
+        present = self._presence.get(keyword)
+        if present is None:
+            if WORD_PATTERN.fullmatch(keyword):
+                # A word keyword can only occur inside a single token
+                if self._vocabulary_text is None:
+                    self._vocabulary_text = '\n'.join(self.positions)
+                present = keyword in self._vocabulary_text
+            else:
+                present = keyword in self.text
+            self._presence[keyword] = present
+
+        return present
+
+    def scan_keywords(self, keywords):
+        """
+        Resolve hit counts and first offsets for a batch of keywords at once.
+        Compiles the keywords not seen before into one automaton and walks the
+        token vocabulary a single time; a word keyword can only occur inside a
+        token, so each token's matches are weighted by how often it appears.
+        Returns {keyword: (hit_count, first_offset)} for the batch.
+        """
+        pending = set(k for k in keywords if k and k not in self.hits)
+        word_keywords = set(k for k in pending if WORD_PATTERN.fullmatch(k))
+
+        for keyword in pending - word_keywords:
+            first = self.text.find(keyword)
+            self.hits[keyword] = (self.text.count(keyword), first if first >= 0 else None)
+
+        if word_keywords:
+            matcher = KeywordMatcher(word_keywords)
+            counts = dict.fromkeys(matcher.keywords, 0)
+            firsts = dict.fromkeys(matcher.keywords)
+
+            for token, positions in self.positions.items():
+                for start, keyword in matcher.iter_matches(token):
+                    counts[keyword] += len(positions)
+                    offset = positions[0] + start
+                    if firsts[keyword] is None or offset < firsts[keyword]:
+                        firsts[keyword] = offset
+
+            for keyword in matcher.keywords:
+                self.hits[keyword] = (counts[keyword], firsts[keyword])
+
+        return {k: self.hits[k] for k in keywords if k}
+
+    def first_occurrence(self, keyword):
+        """Return the offset of the first whole-word occurrence, or None."""
+        positions = self.positions.get(keyword)
+        return positions[0] if positions else None
+
+    def evidence_window(self, keyword, radius=100, limit=150):
+        """
+        Return an evidence snippet around the first whole-word occurrence
+        of keyword, clipped to its line and sentence, or None.
+        """
+        start = self.first_occurrence(keyword)
+        if start is None:
+            return None
+
+        return evidence_snippet(self.text, start, start + len(keyword), radius, limit)
+
+    def evidence_offsets(self, keyword, radius=100, limit=150):
+        """Like evidence_window, but return (start, end) offsets into the text."""
+        start = self.first_occurrence(keyword)
+        if start is None:
+            return None
+
+        span = evidence_span(self.text, start, start + len(keyword), radius, limit)
+        return span if span[1] > span[0] else None
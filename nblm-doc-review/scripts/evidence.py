@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Evidence snippet extraction for compliance checking.
+Works from match offsets, so cost depends on the window size, not on
+the length of the line or document the match sits in.
+"""
+
+import re
+
+# Sentence terminator followed by whitespace, e.g. ". " or "?\n"
+SENTENCE_BREAK = re.compile(r'[.!?]\s+')
+
+
+def evidence_span(text, start, end, radius=100, limit=150):
+    """
+    Return (lo, hi) offsets of the evidence window around text[start:end].
+    The window extends up to radius characters either side of the match,
+    is clipped to the enclosing line and sentence, and is at most limit
+    characters long. Only the window itself is ever scanned.
+    """
+    lo = max(0, start - radius)
+    hi = min(len(text), end + radius)
+
+    # Clip to the enclosing line
+    newline = text.rfind('\n', lo, start)
+    if newline >= 0:
+        lo = newline + 1
+    newline = text.find('\n', end, hi)
+    if newline >= 0:
+        hi = newline
+
+    # Clip to the enclosing sentence
+    last_break = None
+    for last_break in SENTENCE_BREAK.finditer(text, lo, start):
+        pass
+    if last_break is not None:
+        lo = last_break.end()
+    next_break = SENTENCE_BREAK.search(text, end, min(len(text), hi + 1))
+    if next_break is not None:
+        hi = min(hi, next_break.start() + 1)
+
+    # Keep the match inside the limit, centred when the window is too long
+    if hi - lo > limit:
+        lo = max(lo, start - (limit - (end - start)) // 2)
+        hi = min(hi, lo + limit)
+
+    # Trim surrounding whitespace
+    while lo < hi and text[lo].isspace():
+        lo += 1
+    while hi > lo and text[hi - 1].isspace():
+        hi -= 1
+
+    return lo, hi
+
+
+def evidence_snippet(text, start, end, radius=100, limit=150):
+    """Return the evidence window around text[start:end] as a string."""
+    lo, hi = evidence_span(text, start, end, radius, limit)
+    return text[lo:hi]
@@ -4,47 +4,214 @@ Extract text content from various document formats.
 Supports: .docx, .pdf, .txt, .md
 """
 
+import glob
+import os
 import sys
 import zipfile
+from functools import partial
 import xml.etree.ElementTree as ET
+from multiprocessing import Pool, current_process
 from pathlib import Path
 
+from extraction_cache import iter_cached_paragraphs
 
-def extract_docx(file_path):
+
+W_NAMESPACE = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+PARAGRAPH_TAG = f'{{{W_NAMESPACE}}}p'
+TEXT_TAG = f'{{{W_NAMESPACE}}}t'
+
+
+def iter_docx_paragraphs(file_path):
+    """
+    Yield the non-empty paragraph texts of a .docx file while it is parsed.
+    Elements are discarded as soon as they close, so memory stays flat in
+    document size. Paragraphs nested in text boxes are yielded after their
+    enclosing paragraph, which also contains their text.
+    """
+    with zipfile.ZipFile(file_path, 'r') as zip_ref:
+        with zip_ref.open('word/document.xml') as xml_file:
+            elements = []
+            # Text parts of each paragraph inside the current outermost one,
+            # in document order, and which of them are still open
+            paragraphs = []
+            open_paragraphs = []
+
+            for event, elem in ET.iterparse(xml_file, events=('start', 'end')):
+                if event == 'start':
+                    elements.append(elem)
+                    if elem.tag == PARAGRAPH_TAG:
+                        open_paragraphs.append(len(paragraphs))
+                        paragraphs.append([])
+                    continue
+
+                if elem.tag == TEXT_TAG:
+                    if elem.text:
+                        for i in open_paragraphs:
+                            paragraphs[i].append(elem.text)
+                elif elem.tag == PARAGRAPH_TAG:
+                    open_paragraphs.pop()
+                    if not open_paragraphs:
+                        for parts in paragraphs:
+                            if parts:
+                                yield ''.join(parts)
+                        paragraphs = []
+
+                # Detach the finished element; it is always its parent's last child
+                elements.pop()
+                elem.clear()
+                if elements:
+                    elements[-1].remove(elem)
+
+
+def read_docx(file_path):
+    """Read text from .docx file, raising on failure"""
+    return '\n'.join(iter_docx_paragraphs(file_path))
+
+
+# PDFs with fewer pages are extracted in-process; pool startup would dominate
+PARALLEL_PDF_MIN_PAGES = 64
+MAX_PDF_PAGES_PER_TASK = 16
+
+# Reader of the PDF a pool worker is extracting, parsed once per worker
+_pdf_reader = None
+_pdf_reader_path = None
+
+
+def _extract_pdf_pages(task):
+    """Pool worker: return the texts of pages [start, stop) of a PDF"""
+    global _pdf_reader, _pdf_reader_path
+    import PyPDF2
+    file_path, start, stop = task
+    if _pdf_reader_path != file_path:
+        _pdf_reader = PyPDF2.PdfReader(file_path)
+        _pdf_reader_path = file_path
+    return [_pdf_reader.pages[i].extract_text() for i in range(start, stop)]
+
+
+def iter_pdf_pages(file_path, workers=None):
+    """
+    Yield the text of each page of a .pdf file (ImportError without PyPDF2).
+    Large PDFs are split into page ranges extracted by a process pool of
+    workers processes (default: CPU count); pages are still yielded in
+    order, each range as soon as it and all earlier ones are done.
+    """
+    import PyPDF2
+    workers = workers or os.cpu_count() or 1
+    with open(file_path, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        page_count = len(reader.pages)
+        # Pool workers are daemonic and cannot start pools of their own
+        if workers < 2 or page_count < PARALLEL_PDF_MIN_PAGES or current_process().daemon:
+            for page in reader.pages:
+                yield page.extract_text()
+            return
+
+    # Aim for several ranges per worker so uneven pages balance out
+    per_task = max(1, min(MAX_PDF_PAGES_PER_TASK, page_count // (workers * 4)))
+    tasks = [
+        (str(file_path), start, min(start + per_task, page_count))
+        for start in range(0, page_count, per_task)
+    ]
+    with Pool(min(workers, len(tasks))) as pool:
+        for pages in pool.imap(_extract_pdf_pages, tasks):
+            yield from pages
+
+
+def read_pdf(file_path):
+    """Read text from .pdf file, raising on failure (ImportError without PyPDF2)"""
+    return '\n'.join(iter_pdf_pages(file_path))
+
+
+def read_text(file_path):
+    """Read .txt or .md file, raising on failure"""
+    with open(file_path, 'r', encoding='utf-8') as file:
+        return file.read()
+
+
+READERS = {
+    '.docx': read_docx,
+    '.pdf': read_pdf,
+    '.txt': read_text,
+    '.md': read_text,
+}
+
+
+# Paragraph streams served through the extraction cache. Bump an extractor's
+# version whenever its output changes so stale entries stop matching.
+CACHED_EXTRACTORS = {
+    '.docx': ('docx-paragraphs/1', iter_docx_paragraphs),
+    '.pdf': ('pdf-pages/1', iter_pdf_pages),
+}
+
+
+def collect_documents(inputs):
+    """
+    Expand files, directories and glob patterns into a sorted,
+    de-duplicated list of supported documents.
+    """
+    found = []
+    for item in inputs:
+        item = os.path.expanduser(str(item))
+        if any(c in item for c in '*?['):
+            candidates = [Path(m) for m in sorted(glob.glob(item, recursive=True))]
+        else:
+            candidates = [Path(item)]
+
+        for p in candidates:
+            if p.is_dir():
+                found.extend(sorted(f for f in p.rglob('*') if f.suffix.lower() in READERS))
+            elif p.is_file() and p.suffix.lower() in READERS:
+                found.append(p)
+
+    seen = set()
+    unique = []
+    for p in found:
+        if str(p) not in seen:
+            unique.append(p)
+            seen.add(str(p))
+    return unique
+
+
+def iter_document_paragraphs(file_path, use_cache=True, workers=None):
+    """
+    Yield paragraphs (pages for PDF, lines for text) of any supported
+    document, raising on failure. Joined with newlines they give the
+    read_document text.
+    """
+    suffix = Path(file_path).suffix.lower()
+    if suffix not in CACHED_EXTRACTORS:
+        return iter(read_document(file_path).split('\n'))
+    extractor, extract = CACHED_EXTRACTORS[suffix]
+    if suffix == '.pdf' and workers is not None:
+        extract = partial(iter_pdf_pages, workers=workers)
+    if not use_cache:
+        return extract(file_path)
+    return iter_cached_paragraphs(file_path, extractor, extract)
+
+
+def read_document(file_path, use_cache=True, workers=None):
+    """Read text from any supported document, raising on failure"""
+    suffix = Path(file_path).suffix.lower()
+    if suffix in CACHED_EXTRACTORS:
+        return '\n'.join(iter_document_paragraphs(file_path, use_cache, workers))
+    reader = READERS.get(suffix)
+    if reader is None:
+        raise ValueError(f"Unsupported file format: {suffix}")
+    return reader(file_path)
+
+
+def extract_docx(file_path, use_cache=True):
     """Extract text from .docx file"""
     try:
-        with zipfile.ZipFile(file_path, 'r') as zip_ref:
-            with zip_ref.open('word/document.xml') as xml_file:
-                tree = ET.parse(xml_file)
-                root = tree.getroot()
-
-                namespace = {'w': 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'}
-                paragraphs = root.findall('.//w:p', namespace)
-
-                text_content = []
-                for para in paragraphs:
-                    para_text = []
-                    for text_node in para.findall('.//w:t', namespace):
-                        if text_node.text:
-                            para_text.append(text_node.text)
-                    if para_text:
-                        text_content.append(''.join(para_text))
-
-                return '\n'.join(text_content)
+        return read_document(file_path, use_cache)
     except Exception as e:
         return f"Error extracting DOCX: {str(e)}"
 
 
-def extract_pdf(file_path):
+def extract_pdf(file_path, use_cache=True, workers=None):
     """Extract text from .pdf file"""
     try:
-        import PyPDF2
-        with open(file_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            text_content = []
-            for page in reader.pages:
-                text_content.append(page.extract_text())
-            return '\n'.join(text_content)
+        return read_document(file_path, use_cache, workers)
     except ImportError:
         return "Error: PyPDF2 not installed. Install with: pip install PyPDF2"
     except Exception as e:
@@ -54,18 +221,24 @@ def extract_pdf(file_path):
 def extract_text(file_path):
     """Extract text from .txt or .md file"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            return file.read()
+        return read_text(file_path)
     except Exception as e:
         return f"Error reading file: {str(e)}"
 
 
 def main():
     if len(sys.argv) < 2:
-        print("Usage: python extract_content.py <file_path>")
+        print("Usage: python extract_content.py <file_path> [--no-cache] [--workers N]")
         sys.exit(1)
 
     file_path = sys.argv[1]
+    use_cache = '--no-cache' not in sys.argv
+    workers = None
+
+    if '--workers' in sys.argv:
+        idx = sys.argv.index('--workers')
+        if idx + 1 < len(sys.argv):
+            workers = int(sys.argv[idx + 1])
     path = Path(file_path)
 
     if not path.exists():
@@ -74,10 +247,21 @@ def main():
 
     suffix = path.suffix.lower()
 
-    if suffix == '.docx':
-        content = extract_docx(file_path)
-    elif suffix == '.pdf':
-        content = extract_pdf(file_path)
+    if suffix in ('.docx', '.pdf'):
+        # Print paragraphs (PDF pages) as they arrive rather than joining them first
+        try:
+            printed = False
+            for paragraph in iter_document_paragraphs(file_path, use_cache, workers):
+                print(paragraph)
+                printed = True
+            if not printed:
+                print()
+        except ImportError:
+            print("Error: PyPDF2 not installed. Install with: pip install PyPDF2")
+        except Exception as e:
+            label = 'DOCX' if suffix == '.docx' else 'PDF'
+            print(f"Error extracting {label}: {str(e)}")
+        return
     elif suffix in ['.txt', '.md']:
         content = extract_text(file_path)
     else:
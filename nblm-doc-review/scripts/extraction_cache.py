@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Content-addressed on-disk cache of extracted document paragraphs.
+Entries are keyed by the SHA-256 of the file contents plus an extractor
+id, so renamed or copied files hit and edited files miss. The cache
+directory is shared by every skill that extracts documents; the least
+recently used entries are evicted once it outgrows its size bound.
+
+Each entry holds one JSON-encoded paragraph per line followed by an end
+marker, so paragraphs are written and read back one at a time and memory
+stays flat however long the document is. vendor-ddq-research imports this
+module from here, so both skills read and write the same entries.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+CACHE_VERSION = 2
+
+# Override the cache location, or set to "off" to disable caching
+CACHE_DIR_ENV = 'AGENT_SKILLS_EXTRACTION_CACHE'
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+ENTRY_SUFFIX = '.jsonl'
+
+# Files evict() counts: entries of this and older formats, and answer_cache's
+EVICTABLE_SUFFIXES = ('.json', '.jsonl')
+
+# Last line of a complete entry; a paragraph is never null
+END_MARKER = b'null\n'
+
+
+def default_cache_dir():
+    """Return the cache directory, or None if caching is disabled."""
+    configured = os.environ.get(CACHE_DIR_ENV)
+    if configured:
+        if configured.lower() in ('0', 'off', 'none', 'false'):
+            return None
+        return Path(configured).expanduser()
+    return Path.home() / '.cache' / 'agent-skills' / 'extraction'
+
+
+def file_digest(file_path):
+    """SHA-256 hex digest of a file's contents, read in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(digest, extractor):
+    """Combine a content digest with the extractor id and cache format."""
+    return hashlib.sha256(f"{CACHE_VERSION}:{extractor}:{digest}".encode('utf-8')).hexdigest()
+
+
+def open_entry(cache_dir, key):
+    """Open the complete entry for key in binary mode, or return None on a miss."""
+    path = Path(cache_dir) / f"{key}{ENTRY_SUFFIX}"
+    try:
+        f = open(path, 'rb')
+    except OSError:
+        return None
+    try:
+        f.seek(-len(END_MARKER), os.SEEK_END)
+        complete = f.read() == END_MARKER
+        f.seek(0)
+    except OSError:
+        complete = False
+    if not complete:
+        f.close()
+        return None
+
+    # Touch the entry so eviction sees it as recently used
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+    return f
+
+
+def iter_entry(f):
+    """Yield the paragraphs of an entry opened by open_entry, then close it."""
+    with f:
+        for line in f:
+            paragraph = json.loads(line)
+            if paragraph is None:
+                return
+            yield paragraph
+
+
+class EntryWriter:
+    """
+    Writes an entry paragraph by paragraph to a temporary file that is
+    renamed into place by commit(). Write errors abandon the entry
+    instead of failing the extraction.
+    """
+
+    def __init__(self, cache_dir, key):
+        self.cache_dir = Path(cache_dir)
+        self.path = self.cache_dir / f"{key}{ENTRY_SUFFIX}"
+        self.tmp_path = self.cache_dir / f"{key}.{os.getpid()}.tmp"
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self.out = open(self.tmp_path, 'wb')
+        except OSError:
+            self.out = None
+
+    def write(self, paragraph):
+        if self.out is None:
+            return
+        try:
+            self.out.write(json.dumps(paragraph).encode('ascii') + b'\n')
+        except OSError:
+            self.discard()
+
+    def commit(self, max_bytes=DEFAULT_MAX_BYTES):
+        """Publish the entry atomically, then evict old entries over max_bytes."""
+        if self.out is None:
+            return
+        try:
+            self.out.write(END_MARKER)
+            self.out.close()
+            self.out = None
+            os.replace(self.tmp_path, self.path)
+            evict(self.cache_dir, max_bytes)
+        except OSError:
+            self.discard()
+
+    def discard(self):
+        if self.out is not None:
+            try:
+                self.out.close()
+            except OSError:
+                pass
+            self.out = None
+        try:
+            os.remove(self.tmp_path)
+        except OSError:
+            pass
+
+
+def evict(cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+    """Delete least recently used entries until the cache fits max_bytes."""
+    entries = []
+    total = 0
+    for entry in os.scandir(cache_dir):
+        if not entry.name.endswith(EVICTABLE_SUFFIXES):
+            continue
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total += stat.st_size
+
+    entries.sort()
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            # Another process may have evicted it already
+            pass
+        total -= size
+
+
+def iter_cached_paragraphs(file_path, extractor, extract, cache_dir=None,
+                           max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Yield the paragraphs of file_path, from the cache when possible.
+    extract(file_path) must yield paragraph strings; extractor identifies
+    it and its version, and must change whenever its output would.
+    On a miss paragraphs are yielded and written to the entry as they are
+    extracted; the entry is published once extraction completes, and
+    dropped if extraction fails or the caller stops reading early.
+    """
+    if cache_dir is None:
+        cache_dir = default_cache_dir()
+    if cache_dir is None:
+        yield from extract(file_path)
+        return
+
+    key = cache_key(file_digest(file_path), extractor)
+    cached = open_entry(cache_dir, key)
+    if cached is not None:
+        yield from iter_entry(cached)
+        return
+
+    # A read-only or full cache must never fail an extraction
+    writer = EntryWriter(cache_dir, key)
+    try:
+        for paragraph in extract(file_path):
+            writer.write(paragraph)
+            yield paragraph
+    except BaseException:
+        writer.discard()
+        raise
+    writer.commit(max_bytes)
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Multi-keyword matcher (Aho-Corasick) for compliance checking.
+Finds every occurrence of a whole keyword set in one pass over the text.
+"""
+
+from collections import deque
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton compiled from a fixed set of keywords."""
+
+    def __init__(self, keywords):
+        self.keywords = sorted(set(k for k in keywords if k))
+
+        # State 0 is the root; each state has transitions, a failure link
+        # and the keywords that end at it
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+        for keyword in self.keywords:
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append(keyword)
+
+        # Breadth-first pass to wire failure links
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state].extend(self._output[self._fail[next_state]])
+
+    def iter_matches(self, text):
+        """Yield (start_offset, keyword) for every keyword occurrence in text."""
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        state = 0
+
+        for i, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for keyword in output[state]:
+                yield i - len(keyword) + 1, keyword
@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+"""
+Persistent inverted index of a NotebookLM library for notebook selection.
+Each notebook field (name, description, each topic) becomes a weighted
+slot; each distinct letter run of the fields has a posting list of the
+slots containing it, so scoring a keyword touches only the notebooks
+whose fields contain it.
+
+Each keyword maps to a row of the term-by-notebook weight matrix, packed
+into one integer with a 16-bit lane per notebook, so scoring a document
+(multiplying its keyword vector by the matrix) is a handful of big-integer
+additions, and thresholding is one more addition and mask. Scores are
+identical to notebook_selector.score_notebook.
+
+The index is saved next to library.json in a compact binary form: a JSON
+header (notebook ids, topics, array sizes) followed by the letter runs and
+the posting arrays. Notebook records are read from library.json itself.
+It is rebuilt automatically when the library's mtime, size or content
+hash changes.
+"""
+
+import hashlib
+import heapq
+import json
+import os
+import re
+import sys
+from array import array
+from bisect import bisect_right
+from itertools import compress
+from pathlib import Path
+
+INDEX_VERSION = 2
+
+# Arrays saved after the header, in order
+INDEX_ARRAYS = ('slot_notebooks', 'slot_weights', 'run_starts', 'run_slot_starts', 'run_slot_ids')
+
+NAME_WEIGHT = 5
+DESCRIPTION_WEIGHT = 3
+TOPIC_WEIGHT = 2
+
+# Packed rows use one lane per notebook; scores must stay below the lane's
+# top bit, which thresholding uses as its comparison flag
+LANE_BYTES = 2
+LANE_LIMIT = 1 << (8 * LANE_BYTES - 1)
+
+# Thresholding collects passing notebooks one by one when fewer than
+# 1 in SPARSE_PASSING_RATIO pass
+SPARSE_PASSING_RATIO = 64
+
+# Memoized packed rows are dropped once they total this many bytes
+MAX_ROW_CACHE_BYTES = 64 * 1024 * 1024
+
+RUN_PATTERN = re.compile(r'[a-z]+')
+INDEXED_KEYWORD = re.compile(r'[a-z]{3,}')
+
+# Indexes loaded in this process: path -> (mtime_ns, size, LibraryIndex)
+_loaded = {}
+
+
+def library_notebooks(library):
+    """Return the notebook list of a parsed library (dict or list format)."""
+    notebooks = library.get('notebooks', {})
+    if isinstance(notebooks, dict):
+        return list(notebooks.values())
+    return notebooks
+
+
+def index_path_for(library_path):
+    """Path of the index file stored next to library.json."""
+    library_path = Path(library_path)
+    return library_path.with_name(library_path.stem + '.index')
+
+
+def _legacy_index_path(library_path):
+    library_path = Path(library_path)
+    return library_path.with_name(library_path.stem + '.index.json')
+
+
+def _pack(lanes):
+    """Pack an array('H') of lane values into a little-endian integer."""
+    if sys.byteorder != 'little':
+        lanes = array('H', lanes)
+        lanes.byteswap()
+    return int.from_bytes(lanes.tobytes(), 'little')
+
+
+def _unpack(value, count):
+    """Inverse of _pack for count lanes."""
+    lanes = array('H')
+    lanes.frombytes(value.to_bytes(count * LANE_BYTES, 'little'))
+    if sys.byteorder != 'little':
+        lanes.byteswap()
+    return lanes
+
+
+class LibraryIndex:
+    """Weighted field slots of a library with letter-run and topic lookups."""
+
+    def __init__(self, notebooks, arrays, runs_text, topics, source=None):
+        self.notebooks = notebooks
+        # Slot i belongs to notebook slot_notebooks[i] and weighs slot_weights[i]
+        self.slot_notebooks = arrays['slot_notebooks']
+        self.slot_weights = arrays['slot_weights']
+        # Every distinct letter run, each followed by a newline; run i starts
+        # at run_starts[i] and lists its slots in
+        # run_slot_ids[run_slot_starts[i]:run_slot_starts[i + 1]]
+        self.runs_text = runs_text
+        self.run_starts = arrays['run_starts']
+        self.run_slot_starts = arrays['run_slot_starts']
+        self.run_slot_ids = arrays['run_slot_ids']
+        # lowercased topic -> topic slots, for matching topics inside keywords
+        self.topics = topics
+        self.source = source or {}
+
+        # Largest score one keyword can give a notebook: name, description
+        # and every topic matching
+        self.max_keyword_score = NAME_WEIGHT + DESCRIPTION_WEIGHT + TOPIC_WEIGHT * max(
+            (len(notebook.get('topics', [])) for notebook in notebooks), default=0)
+
+        self._rows = {}
+        self._max_cached_rows = max(1, MAX_ROW_CACHE_BYTES // max(1, LANE_BYTES * len(notebooks)))
+        # 1 in every lane; multiples of it build per-lane constants
+        self._lane_ones = int.from_bytes((1).to_bytes(LANE_BYTES, 'little') * len(notebooks), 'little')
+        self._lane_top_bits = LANE_LIMIT * self._lane_ones
+
+    @classmethod
+    def build(cls, notebooks, source=None):
+        """Index a list of notebook dicts."""
+        slot_notebooks = array('I')
+        slot_weights = array('B')
+        run_ids = {}
+        run_slots = []
+        topics = {}
+
+        def add_field(text, notebook_id, weight):
+            slot_id = len(slot_notebooks)
+            slot_notebooks.append(notebook_id)
+            slot_weights.append(weight)
+            for run in set(RUN_PATTERN.findall(text)):
+                run_id = run_ids.get(run)
+                if run_id is None:
+                    run_id = run_ids[run] = len(run_slots)
+                    run_slots.append([])
+                run_slots[run_id].append(slot_id)
+            return slot_id
+
+        for notebook_id, notebook in enumerate(notebooks):
+            add_field(notebook.get('name', '').lower(), notebook_id, NAME_WEIGHT)
+            add_field(notebook.get('description', '').lower(), notebook_id, DESCRIPTION_WEIGHT)
+            for topic in notebook.get('topics', []):
+                topic_lower = topic.lower()
+                slot_id = add_field(topic_lower, notebook_id, TOPIC_WEIGHT)
+                topics.setdefault(topic_lower, []).append(slot_id)
+
+        # run_ids is in run id order
+        run_starts = array('I', [0])
+        for run in run_ids:
+            run_starts.append(run_starts[-1] + len(run) + 1)
+        run_slot_starts = array('I', [0])
+        run_slot_ids = array('I')
+        for slot_ids in run_slots:
+            run_slot_ids.extend(slot_ids)
+            run_slot_starts.append(len(run_slot_ids))
+
+        arrays = {
+            'slot_notebooks': slot_notebooks,
+            'slot_weights': slot_weights,
+            'run_starts': run_starts,
+            'run_slot_starts': run_slot_starts,
+            'run_slot_ids': run_slot_ids,
+        }
+        runs_text = ''.join(run + '\n' for run in run_ids)
+        return cls(notebooks, arrays, runs_text, topics, source)
+
+    @classmethod
+    def from_bytes(cls, data, notebooks):
+        """
+        Load a saved index for notebooks, the parsed library it was built
+        from. Raises ValueError if it was saved for other notebooks, by
+        another version or on a platform with other array sizes.
+        """
+        header_end = data.index(b'\n')
+        header = json.loads(data[:header_end].decode('utf-8'))
+        if header.get('version') != INDEX_VERSION:
+            raise ValueError('index version mismatch')
+        if header['notebook_ids'] != [notebook.get('id') for notebook in notebooks]:
+            raise ValueError('index was built for other notebooks')
+
+        offset = header_end + 1
+        runs_text = data[offset:offset + header['runs_bytes']].decode('ascii')
+        offset += header['runs_bytes']
+
+        arrays = {}
+        for name, typecode, itemsize, length in header['arrays']:
+            values = array(typecode)
+            if values.itemsize != itemsize:
+                raise ValueError('index array sizes differ on this platform')
+            values.frombytes(data[offset:offset + itemsize * length])
+            if len(values) != length:
+                raise ValueError('index is truncated')
+            if sys.byteorder != 'little':
+                values.byteswap()
+            arrays[name] = values
+            offset += itemsize * length
+
+        return cls(notebooks, arrays, runs_text, header['topics'], header['source'])
+
+    def to_bytes(self):
+        """Serialize the index; notebooks are recorded by id only."""
+        runs_bytes = self.runs_text.encode('ascii')
+        arrays = [getattr(self, name) for name in INDEX_ARRAYS]
+        header = {
+            'version': INDEX_VERSION,
+            'source': self.source,
+            'notebook_ids': [notebook.get('id') for notebook in self.notebooks],
+            'topics': self.topics,
+            'runs_bytes': len(runs_bytes),
+            'arrays': [
+                [name, values.typecode, values.itemsize, len(values)]
+                for name, values in zip(INDEX_ARRAYS, arrays)
+            ],
+        }
+        parts = [json.dumps(header).encode('utf-8'), b'\n', runs_bytes]
+        for values in arrays:
+            if sys.byteorder != 'little':
+                values = array(values.typecode, values)
+                values.byteswap()
+            parts.append(values.tobytes())
+        return b''.join(parts)
+
+    def keyword_slots(self, keyword):
+        """
+        Slots a keyword scores in, each at most once: fields containing the
+        keyword, plus topics contained in it.
+        """
+        if not INDEXED_KEYWORD.fullmatch(keyword):
+            return self._scan_slots(keyword)
+
+        matched = set()
+
+        # A letters-only keyword occurs in a field only inside one of its
+        # letter runs; find each run containing it once
+        runs_text = self.runs_text
+        run_starts = self.run_starts
+        position = runs_text.find(keyword)
+        while position != -1:
+            run_id = bisect_right(run_starts, position) - 1
+            matched.update(self.run_slot_ids[self.run_slot_starts[run_id]:self.run_slot_starts[run_id + 1]])
+            position = runs_text.find(keyword, run_starts[run_id + 1])
+
+        # Topics that are substrings of the keyword (including empty topics)
+        for start in range(len(keyword) + 1):
+            for end in range(start, len(keyword) + 1):
+                matched.update(self.topics.get(keyword[start:end], ()))
+
+        return sorted(matched)
+
+    def _scan_slots(self, keyword):
+        """Match a keyword the index cannot look up by scanning every field."""
+        slot_ids = []
+        slot_id = 0
+        for notebook in self.notebooks:
+            if keyword in notebook.get('name', '').lower():
+                slot_ids.append(slot_id)
+            if keyword in notebook.get('description', '').lower():
+                slot_ids.append(slot_id + 1)
+            slot_id += 2
+            for topic in notebook.get('topics', []):
+                topic_lower = topic.lower()
+                if keyword in topic_lower or topic_lower in keyword:
+                    slot_ids.append(slot_id)
+                slot_id += 1
+        return slot_ids
+
+    def keyword_row(self, keyword):
+        """
+        Row of the term-by-notebook weight matrix for a keyword, packed into
+        one integer: lane i holds the summed weight of notebook i's fields
+        the keyword matches. Memoized.
+        """
+        row = self._rows.get(keyword)
+        if row is None:
+            lanes = array('H', bytes(LANE_BYTES * len(self.notebooks)))
+            for slot_id in self.keyword_slots(keyword):
+                lanes[self.slot_notebooks[slot_id]] += self.slot_weights[slot_id]
+            row = _pack(lanes)
+            if len(self._rows) >= self._max_cached_rows:
+                self._rows.clear()
+            self._rows[keyword] = row
+        return row
+
+    def _packed_scores(self, keywords):
+        """Sum of the keyword rows, or None if a lane could overflow."""
+        if len(keywords) * self.max_keyword_score >= LANE_LIMIT:
+            return None
+        total = 0
+        for keyword in keywords:
+            total += self.keyword_row(keyword)
+        return total
+
+    def _passing_flags(self, total, threshold):
+        """Lanes of total as bytes, top byte nonzero where the lane is >= threshold (0 < threshold < LANE_LIMIT)."""
+        # Adding LANE_LIMIT - threshold to each lane sets its top bit exactly
+        # when the lane is >= threshold; lanes never carry into each other
+        flags = (total + (LANE_LIMIT - threshold) * self._lane_ones) & self._lane_top_bits
+        return flags.to_bytes(len(self.notebooks) * LANE_BYTES, 'little')
+
+    def _passing(self, total, threshold):
+        """Notebook ids whose lane in total is at least threshold."""
+        count = len(self.notebooks)
+        if threshold <= 0:
+            return range(count)
+        if threshold >= LANE_LIMIT:
+            return []
+        flags = self._passing_flags(total, threshold)[LANE_BYTES - 1::LANE_BYTES]
+        top_bit = LANE_LIMIT >> (8 * (LANE_BYTES - 1))
+        if flags.count(top_bit) * SPARSE_PASSING_RATIO > count:
+            return compress(range(count), flags)
+
+        # Few notebooks pass (e.g. after _top_k_threshold): jump between them
+        passing = []
+        notebook_id = flags.find(top_bit)
+        while notebook_id != -1:
+            passing.append(notebook_id)
+            notebook_id = flags.find(top_bit, notebook_id + 1)
+        return passing
+
+    def _top_k_threshold(self, total, threshold, top_k, max_score):
+        """
+        Raise threshold to the top_k-th best score, so partial selection only
+        sees notebooks that can make the top_k. Each probe counts passing
+        lanes with one packed addition instead of visiting every notebook.
+        """
+        top_bit = LANE_LIMIT >> (8 * (LANE_BYTES - 1))
+        low = max(threshold, 1)
+        if low >= LANE_LIMIT or self._passing_flags(total, low).count(top_bit) < top_k:
+            return threshold
+
+        # At least top_k lanes reach low; none exceed max_score
+        high = min(max_score + 1, LANE_LIMIT)
+        while high - low > 1:
+            middle = (low + high) // 2
+            if self._passing_flags(total, middle).count(top_bit) >= top_k:
+                low = middle
+            else:
+                high = middle
+        return low
+
+    def score(self, keywords):
+        """
+        Multiply a keyword count vector by the weight matrix.
+        Returns {notebook index: score} for notebooks scoring above zero.
+        """
+        keywords = list(keywords)
+        total = self._packed_scores(keywords)
+        if total is None:
+            scores = {}
+            for keyword in keywords:
+                for slot_id in self.keyword_slots(keyword):
+                    notebook_id = self.slot_notebooks[slot_id]
+                    scores[notebook_id] = scores.get(notebook_id, 0) + self.slot_weights[slot_id]
+            return scores
+
+        lanes = _unpack(total, len(self.notebooks))
+        return {notebook_id: lanes[notebook_id] for notebook_id in self._passing(total, 1)}
+
+    def select(self, keywords, threshold=5, top_k=None):
+        """
+        Return [(notebook index, score)] for notebooks scoring at least
+        threshold, best first with ties in library order. With top_k only
+        the best top_k are picked, by partial selection.
+        """
+        keywords = list(keywords)
+        total = self._packed_scores(keywords)
+        if total is None:
+            scores = self.score(keywords)
+            if threshold <= 0:
+                for notebook_id in range(len(self.notebooks)):
+                    scores.setdefault(notebook_id, 0)
+            lanes = scores
+            passing = [notebook_id for notebook_id in sorted(scores) if scores[notebook_id] >= threshold]
+        else:
+            lanes = _unpack(total, len(self.notebooks))
+            if top_k is not None and 0 < top_k < len(self.notebooks):
+                max_score = len(keywords) * self.max_keyword_score
+                threshold = self._top_k_threshold(total, threshold, top_k, max_score)
+            passing = self._passing(total, threshold)
+
+        # Both keep equal scores in library order, like a stable reverse sort
+        if top_k is not None:
+            selected = heapq.nlargest(top_k, passing, key=lanes.__getitem__)
+        else:
+            selected = sorted(passing, key=lanes.__getitem__, reverse=True)
+        return [(notebook_id, lanes[notebook_id]) for notebook_id in selected]
+
+
+def _save_index(index_path, index):
+    """Write the index atomically; a read-only library directory is not an error."""
+    tmp_path = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(index.to_bytes())
+        os.replace(tmp_path, index_path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def load_library_index(library_path):
+    """
+    Return the LibraryIndex for library_path, reusing the in-process copy or
+    the saved index while the library is unchanged and rebuilding otherwise.
+    """
+    library_path = Path(library_path)
+    stat = os.stat(library_path)
+    key = str(library_path.resolve())
+
+    cached = _loaded.get(key)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+
+    with open(library_path, 'rb') as f:
+        library_bytes = f.read()
+    notebooks = library_notebooks(json.loads(library_bytes.decode('utf-8')))
+
+    index_path = index_path_for(library_path)
+    try:
+        with open(index_path, 'rb') as f:
+            index = LibraryIndex.from_bytes(f.read(), notebooks)
+    except (OSError, ValueError, KeyError, TypeError):
+        index = None
+
+    source = index.source if index else {}
+    if not (source.get('mtime_ns') == stat.st_mtime_ns and source.get('size') == stat.st_size):
+        # Touched but possibly unchanged: compare content hashes before rebuilding
+        sha256 = hashlib.sha256(library_bytes).hexdigest()
+        if index is None or source.get('sha256') != sha256:
+            index = LibraryIndex.build(notebooks)
+        index.source = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha256': sha256}
+        _save_index(index_path, index)
+        # Indexes of version 1 were saved as JSON under another name
+        try:
+            os.remove(_legacy_index_path(library_path))
+        except OSError:
+            pass
+
+    _loaded[key] = (stat.st_mtime_ns, stat.st_size, index)
+    return index
@@ -7,28 +7,145 @@ import sys
 import json
 import re
 import os
+import socket
 from pathlib import Path
 from collections import Counter
 
+from answer_cache import notebook_stamp
+from library_index import load_library_index
+
+
+KEYWORD_PATTERN = re.compile(r'\b[a-z]{3,}\b')
+WORD_CHAR = re.compile(r'\w')
+NON_WORD_CHAR = re.compile(r'\W')
+
+# Streaming keyword extraction reads this many characters at a time
+CHUNK_SIZE = 1024 * 1024
+
+# Exact counting switches to a heavy-hitters sketch of SKETCH_CAPACITY
+# counters once it has seen more than EXACT_DISTINCT_LIMIT distinct words
+EXACT_DISTINCT_LIMIT = 1000000
+SKETCH_CAPACITY = 10000
+
+# Socket of a running selector_service.py to ask before selecting locally
+SERVICE_SOCKET_ENV = 'NBLM_SELECTOR_SOCKET'
+SERVICE_TIMEOUT = 5.0
+
+# Common stopwords to exclude
+STOPWORDS = {
+    'the', 'and', 'for', 'with', 'this', 'that', 'from', 'have', 'has',
+    'will', 'would', 'could', 'should', 'may', 'must', 'can', 'are',
+    'was', 'were', 'been', 'being', 'not', 'but', 'all', 'any', 'such',
+    'shall', 'including', 'which', 'where', 'when', 'who', 'what'
+}
+
+
+def count_keywords(text, counts=None):
+    """
+    Count candidate keywords of text into counts (a new Counter by default).
+    Counting consecutive pieces of a text gives the same ranking as
+    counting it whole, as long as no word is split between pieces.
+    """
+    if counts is None:
+        counts = Counter()
+    counts.update(KEYWORD_PATTERN.findall(text.lower()))
+    # Dropping stopwords afterwards leaves the order of other words intact
+    for word in STOPWORDS:
+        counts.pop(word, None)
+    return counts
+
 
 def extract_keywords(text, top_n=20):
     """Extract key terms from document text"""
-    # Convert to lowercase and split into words
-    words = re.findall(r'\b[a-z]{3,}\b', text.lower())
-
-    # Common stopwords to exclude
-    stopwords = {
-        'the', 'and', 'for', 'with', 'this', 'that', 'from', 'have', 'has',
-        'will', 'would', 'could', 'should', 'may', 'must', 'can', 'are',
-        'was', 'were', 'been', 'being', 'not', 'but', 'all', 'any', 'such',
-        'shall', 'including', 'which', 'where', 'when', 'who', 'what'
-    }
+    word_counts = count_keywords(text)
+    return [word for word, _ in word_counts.most_common(top_n)]
 
-    # Filter stopwords and count
-    filtered_words = [w for w in words if w not in stopwords]
-    word_counts = Counter(filtered_words)
 
-    return [word for word, _ in word_counts.most_common(top_n)]
+def iter_keyword_chunks(stream, chunk_size=CHUNK_SIZE):
+    """
+    Yield lowercased pieces of a text stream that never split a word.
+    The trailing word characters of each chunk are carried into the next,
+    so matching KEYWORD_PATTERN piece by piece equals matching it on the
+    whole text. A word longer than chunk_size is yielded once as its first
+    chunk_size or more characters and the rest of it is skipped, so it
+    still counts as one token and memory stays bounded.
+    """
+    carry = ''
+    skipping = False
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        if skipping:
+            # Drop the rest of an over-long word that was already yielded
+            boundary = NON_WORD_CHAR.search(chunk)
+            if boundary is None:
+                continue
+            chunk = chunk[boundary.start():]
+            skipping = False
+        chunk = carry + chunk
+        cut = len(chunk)
+        while cut and WORD_CHAR.match(chunk, cut - 1):
+            cut -= 1
+        carry = chunk[cut:]
+        if cut:
+            yield chunk[:cut].lower()
+        if len(carry) >= chunk_size:
+            yield carry.lower()
+            carry = ''
+            skipping = True
+    if carry:
+        yield carry.lower()
+
+
+class HeavyHitters:
+    """
+    Misra-Gries summary keeping at most capacity counters.
+    Counts are underestimated by at most total / (capacity + 1), so every
+    word more frequent than that is kept.
+    """
+
+    def __init__(self, capacity=SKETCH_CAPACITY, counts=None):
+        self.capacity = capacity
+        self.counts = Counter()
+        if counts:
+            self.update(counts)
+
+    def update(self, counts):
+        """Merge a Counter of new occurrences into the summary."""
+        self.counts.update(counts)
+        if len(self.counts) > self.capacity:
+            # Subtracting the (capacity + 1)-th largest count from every
+            # counter is that many decrement-all steps at once
+            cutoff = sorted(self.counts.values(), reverse=True)[self.capacity]
+            self.counts = Counter({
+                word: count - cutoff for word, count in self.counts.items() if count > cutoff
+            })
+
+    def most_common(self, n):
+        return self.counts.most_common(n)
+
+
+def stream_keywords(stream, top_n=20, approximate=False,
+                    exact_limit=EXACT_DISTINCT_LIMIT, capacity=SKETCH_CAPACITY):
+    """
+    Extract key terms from a text stream (file object or stdin) in chunks.
+    Counts are exact, giving the same result as extract_keywords on the
+    whole text, until more than exact_limit distinct words are seen; then
+    (or from the start with approximate) a fixed-size HeavyHitters sketch
+    takes over.
+    """
+    counts = HeavyHitters(capacity) if approximate else Counter()
+
+    for piece in iter_keyword_chunks(stream):
+        if isinstance(counts, HeavyHitters):
+            counts.update(count_keywords(piece))
+        else:
+            count_keywords(piece, counts)
+            if len(counts) > exact_limit:
+                counts = HeavyHitters(capacity, counts)
+
+    return [word for word, _ in counts.most_common(top_n)]
 
 
 def score_notebook(notebook, keywords):
@@ -58,72 +175,74 @@ def score_notebook(notebook, keywords):
     return score
 
 
-def select_notebooks(library_path, document_keywords, threshold=5):
-    """Select relevant notebooks from library based on document keywords"""
+def select_notebooks(library_path, document_keywords, threshold=5, top_k=None):
+    """
+    Select relevant notebooks from library based on document keywords.
+    Scores come from the library's persistent index (see library_index),
+    which scores every notebook at once; they equal score_notebook for
+    every notebook. With top_k only the best top_k notebooks are kept,
+    found without sorting them all.
+    """
     try:
-        with open(library_path, 'r') as f:
-            library = json.load(f)
-
-        notebooks_dict = library.get('notebooks', {})
-
-        # Handle both dict and list formats
-        if isinstance(notebooks_dict, dict):
-            notebooks = list(notebooks_dict.values())
-        else:
-            notebooks = notebooks_dict
-
-        if not notebooks:
+        index = load_library_index(library_path)
+        if not index.notebooks:
             return []
 
-        # Score each notebook
-        scored_notebooks = []
-        for notebook in notebooks:
-            score = score_notebook(notebook, document_keywords)
-            if score >= threshold:
-                scored_notebooks.append({
-                    'notebook': notebook,
-                    'score': score
-                })
-
-        # Sort by score descending
-        scored_notebooks.sort(key=lambda x: x['score'], reverse=True)
-
-        return scored_notebooks
+        return [
+            {'notebook': index.notebooks[notebook_id], 'score': score}
+            for notebook_id, score in index.select(document_keywords, threshold, top_k)
+        ]
 
     except Exception as e:
         print(f"Error selecting notebooks: {str(e)}", file=sys.stderr)
         return []
 
 
-def main():
-    if len(sys.argv) < 2:
-        print("Usage: python notebook_selector.py <document_content> [--threshold N]")
-        sys.exit(1)
+def resolve_notebooklm_library_path():
+    """Resolve notebook library path in a runtime-neutral way."""
+    env_dir = Path(os.environ.get('NOTEBOOKLM_SKILL_DIR', '')).expanduser() if os.environ.get('NOTEBOOKLM_SKILL_DIR') else None
+    candidates = []
 
-    document_text = sys.argv[1]
-    threshold = 5
+    if env_dir:
+        candidates.append(env_dir / 'data' / 'library.json')
 
-    # Parse optional threshold
-    if '--threshold' in sys.argv:
-        idx = sys.argv.index('--threshold')
-        if idx + 1 < len(sys.argv):
-            threshold = int(sys.argv[idx + 1])
+    # Prefer sibling skill in a flat repo: notebooklm/data/library.json
+    skills_dir = Path(__file__).resolve().parents[2]
+    candidates.append(skills_dir / 'notebooklm' / 'data' / 'library.json')
+    for path in candidates:
+        if path.exists():
+            return path
+
+    return candidates[0]
 
+
+def select_for_document(document_text, threshold=5, library_path=None, top_k=None):
+    """
+    Select notebooks for a document's text in-process.
+    Returns (result, error); result has the top 'keywords' and the selected
+    'notebooks', as printed by the command line tool.
+    """
     # Extract keywords from document
     keywords = extract_keywords(document_text)
+    return select_for_keywords(keywords, threshold, library_path, top_k)
+
 
+def select_for_keywords(keywords, threshold=5, library_path=None, top_k=None):
+    """Select notebooks for already extracted document keywords; see select_for_document."""
     # Get library path
-    library_path = resolve_notebooklm_library_path()
+    library_path = Path(library_path) if library_path else resolve_notebooklm_library_path()
 
     if not library_path.exists():
-        print(json.dumps({'error': 'NotebookLM library not found'}))
-        sys.exit(1)
+        return None, 'NotebookLM library not found'
 
     # Select relevant notebooks
-    selected = select_notebooks(library_path, keywords, threshold)
+    selected = select_notebooks(library_path, keywords, threshold, top_k)
+    return selection_result(keywords, selected), None
 
-    # Output results as JSON
-    result = {
+
+def selection_result(keywords, selected):
+    """Build the command line tool's JSON result from select_notebooks output."""
+    return {
         'keywords': keywords[:10],  # Top 10 keywords
         'notebooks': [
             {
@@ -131,30 +250,106 @@ def main():
                 'name': nb['notebook']['name'],
                 'url': nb['notebook']['url'],
                 'score': nb['score'],
-                'topics': nb['notebook'].get('topics', [])
+                'topics': nb['notebook'].get('topics', []),
+                # Identifies this version of the library entry for the answer cache
+                'stamp': notebook_stamp(nb['notebook'])
             }
             for nb in selected
         ]
     }
 
-    print(json.dumps(result, indent=2))
 
+def default_service_socket():
+    """Return the selector service socket path, honoring NBLM_SELECTOR_SOCKET."""
+    configured = os.environ.get(SERVICE_SOCKET_ENV)
+    if configured:
+        return Path(configured).expanduser()
+    return Path.home() / '.cache' / 'agent-skills' / 'notebook-selector.sock'
 
-if __name__ == '__main__':
-    main()
-def resolve_notebooklm_library_path():
-    """Resolve notebook library path in a runtime-neutral way."""
-    env_dir = Path(os.environ.get('NOTEBOOKLM_SKILL_DIR', '')).expanduser() if os.environ.get('NOTEBOOKLM_SKILL_DIR') else None
-    candidates = []
 
-    if env_dir:
-        candidates.append(env_dir / 'data' / 'library.json')
+def select_via_service(socket_path, keywords, threshold=5, top_k=None, timeout=SERVICE_TIMEOUT):
+    """
+    Ask a running selector_service.py for notebooks.
+    Returns (result, error) like select_for_keywords, or (None, None) when
+    no service answers at socket_path so the caller can select locally.
+    """
+    request = {'keywords': keywords, 'threshold': threshold, 'top_k': top_k}
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(str(socket_path))
+            sock.sendall((json.dumps(request) + '\n').encode('utf-8'))
+            with sock.makefile('rb') as f:
+                response = json.loads(f.readline())
+    except (AttributeError, OSError, ValueError):
+        # AttributeError: no Unix sockets on this platform
+        return None, None
 
-    # Prefer sibling skill in a flat repo: notebooklm/data/library.json
-    skills_dir = Path(__file__).resolve().parents[2]
-    candidates.append(skills_dir / 'notebooklm' / 'data' / 'library.json')
-    for path in candidates:
-        if path.exists():
-            return path
+    if 'error' in response:
+        return None, response['error']
+    return response, None
 
-    return candidates[0]
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python notebook_selector.py <document_content> [--threshold N] [--top-k N]")
+        print("       python notebook_selector.py --file PATH|- [--approximate] [--threshold N] [--top-k N]")
+        print("Add --socket PATH (or set NBLM_SELECTOR_SOCKET) to ask a running selector_service.py")
+        sys.exit(1)
+
+    document_text = sys.argv[1]
+    document_file = None
+    socket_path = os.environ.get(SERVICE_SOCKET_ENV)
+    threshold = 5
+    top_k = None
+
+    # Read the document from a file or stdin ('-') instead of the command line
+    if '--file' in sys.argv:
+        idx = sys.argv.index('--file')
+        if idx + 1 < len(sys.argv):
+            document_file = sys.argv[idx + 1]
+
+    # Parse optional threshold
+    if '--threshold' in sys.argv:
+        idx = sys.argv.index('--threshold')
+        if idx + 1 < len(sys.argv):
+            threshold = int(sys.argv[idx + 1])
+
+    if '--top-k' in sys.argv:
+        idx = sys.argv.index('--top-k')
+        if idx + 1 < len(sys.argv):
+            top_k = int(sys.argv[idx + 1])
+
+    if '--socket' in sys.argv:
+        idx = sys.argv.index('--socket')
+        if idx + 1 < len(sys.argv):
+            socket_path = sys.argv[idx + 1]
+
+    if document_file:
+        approximate = '--approximate' in sys.argv
+        if document_file == '-':
+            keywords = stream_keywords(sys.stdin, approximate=approximate)
+        else:
+            with open(document_file, 'r', encoding='utf-8', errors='replace') as f:
+                keywords = stream_keywords(f, approximate=approximate)
+    else:
+        keywords = extract_keywords(document_text)
+
+    result = error = None
+    if socket_path:
+        result, error = select_via_service(socket_path, keywords, threshold, top_k)
+        if result is None and error is None:
+            print(f"Selector service not reachable at {socket_path}; selecting locally",
+                  file=sys.stderr)
+    if result is None and error is None:
+        result, error = select_for_keywords(keywords, threshold, top_k=top_k)
+    if error:
+        print(json.dumps({'error': error}))
+        sys.exit(1)
+
+    # Output results as JSON
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Long-lived NotebookLM query workers.
+A worker loads the NotebookLM skill once and answers questions sent over
+its stdin/stdout pipe, so a review pays interpreter startup and skill
+imports once per worker instead of once per question, and answers come
+back as structured frames instead of scraped console output.
+
+Frames are a 4-byte big-endian length followed by that many bytes of UTF-8
+JSON. On startup the worker sends {"ready": true} or {"error": ...}; each
+request {"id", "notebook_id", "question"} is answered with {"id",
+"answer"} or {"id", "error"}.
+"""
+
+import json
+import os
+import select
+import shlex
+import signal
+import struct
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Command that starts a worker instead of this script, e.g. tests/fake_worker.py
+WORKER_COMMAND_ENV = 'NBLM_WORKER_COMMAND'
+
+# Seconds a worker may take to load the skill before it is given up on
+WORKER_START_TIMEOUT = 120
+
+# The skill appends follow-up instructions for interactive use after this
+FOLLOW_UP_MARKER = 'EXTREMELY IMPORTANT:'
+
+FRAME_HEADER = struct.Struct('>I')
+
+
+class WorkerUnavailable(Exception):
+    """No worker could be started; callers should query another way."""
+
+
+class WorkerFailed(Exception):
+    """A worker timed out, died or broke the protocol and was stopped."""
+
+
+def write_frame(stream, message):
+    data = json.dumps(message).encode('utf-8')
+    stream.write(FRAME_HEADER.pack(len(data)) + data)
+    stream.flush()
+
+
+def read_frame(stream):
+    """Read one frame from a blocking stream; None at end of stream."""
+    header = stream.read(FRAME_HEADER.size)
+    if len(header) < FRAME_HEADER.size:
+        return None
+    (length,) = FRAME_HEADER.unpack(header)
+    data = stream.read(length)
+    if len(data) < length:
+        return None
+    return json.loads(data.decode('utf-8'))
+
+
+def _read_exact(fd, size, deadline):
+    chunks = []
+    while size:
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                raise TimeoutError
+        chunk = os.read(fd, size)
+        if not chunk:
+            raise EOFError
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def read_frame_until(fd, deadline):
+    """Read one frame from a pipe fd, raising TimeoutError past deadline."""
+    (length,) = FRAME_HEADER.unpack(_read_exact(fd, FRAME_HEADER.size, deadline))
+    return json.loads(_read_exact(fd, length, deadline).decode('utf-8'))
+
+
+def clean_answer(answer):
+    """Drop the skill's follow-up instructions and blank lines, like the console parser."""
+    answer = answer.split(FOLLOW_UP_MARKER)[0]
+    return '\n'.join(line for line in answer.split('\n') if line.strip())
+
+
+def worker_command(skill_dir):
+    """Command line of a worker for skill_dir, preferring the skill's own virtualenv."""
+    override = os.environ.get(WORKER_COMMAND_ENV)
+    if override:
+        return shlex.split(override)
+
+    python = sys.executable
+    for candidate in (skill_dir / '.venv' / 'bin' / 'python', skill_dir / '.venv' / 'Scripts' / 'python.exe'):
+        if candidate.exists():
+            python = str(candidate)
+            break
+    return [python, str(Path(__file__).resolve()), '--serve', str(skill_dir)]
+
+
+class Worker:
+    """One worker process, answering one question at a time."""
+
+    def __init__(self, command, cwd):
+        try:
+            self.proc = subprocess.Popen(
+                command,
+                cwd=str(cwd),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                start_new_session=True
+            )
+        except OSError as e:
+            raise WorkerUnavailable(f"cannot start worker: {e}")
+        self.next_id = 0
+
+        try:
+            hello = read_frame_until(self.proc.stdout.fileno(), time.monotonic() + WORKER_START_TIMEOUT)
+        except (TimeoutError, EOFError, ValueError):
+            self.close()
+            raise WorkerUnavailable('worker did not start')
+        if not hello.get('ready'):
+            self.close()
+            raise WorkerUnavailable(hello.get('error', 'worker did not start'))
+
+    def ask(self, notebook_id, question, timeout=None):
+        """Return (answer, error); raises WorkerFailed if the worker had to be stopped."""
+        self.next_id += 1
+        request = {'id': self.next_id, 'notebook_id': notebook_id, 'question': question}
+        deadline = time.monotonic() + timeout if timeout else None
+        try:
+            write_frame(self.proc.stdin, request)
+            response = read_frame_until(self.proc.stdout.fileno(), deadline)
+        except TimeoutError:
+            self.close()
+            raise WorkerFailed(f"Failed to query notebook: Timed out after {timeout}s")
+        except (OSError, EOFError, ValueError):
+            self.close()
+            raise WorkerFailed('Failed to query notebook: NotebookLM worker exited unexpectedly')
+
+        if response.get('id') != request['id']:
+            self.close()
+            raise WorkerFailed('Failed to query notebook: NotebookLM worker answered out of order')
+        if 'error' in response:
+            return None, response['error']
+        return clean_answer(response.get('answer', '')), None
+
+    def close(self):
+        """Stop the worker and anything it started."""
+        try:
+            os.killpg(self.proc.pid, signal.SIGKILL)
+        except (AttributeError, OSError):
+            self.proc.kill()
+        self.proc.wait()
+        self.proc.stdin.close()
+        self.proc.stdout.close()
+
+
+class WorkerPool:
+    """
+    Workers shared by concurrent queries, started on demand.
+    A worker is lent to one query at a time, so the pool grows to the
+    number of queries in flight. Once a worker fails to start the pool
+    stops trying and ask() raises WorkerUnavailable.
+    """
+
+    def __init__(self, skill_dir):
+        self.skill_dir = Path(skill_dir)
+        self.error = None
+        self._idle = []
+        self._workers = set()
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def _checkout(self):
+        with self._lock:
+            if self._closed:
+                raise WorkerUnavailable('worker pool is closed')
+            if self.error:
+                raise WorkerUnavailable(self.error)
+            if self._idle:
+                return self._idle.pop()
+
+        try:
+            worker = Worker(worker_command(self.skill_dir), self.skill_dir)
+        except WorkerUnavailable as e:
+            with self._lock:
+                self.error = self.error or str(e)
+            raise
+
+        with self._lock:
+            if self._closed:
+                worker.close()
+                raise WorkerUnavailable('worker pool is closed')
+            self._workers.add(worker)
+        return worker
+
+    def ask(self, notebook_id, question, timeout=None):
+        """Return (answer, error) from an idle or new worker."""
+        worker = self._checkout()
+        try:
+            answer, error = worker.ask(notebook_id, question, timeout)
+        except WorkerFailed as e:
+            with self._lock:
+                self._workers.discard(worker)
+            return None, str(e)
+
+        with self._lock:
+            if self._closed:
+                self._workers.discard(worker)
+                worker.close()
+            else:
+                self._idle.append(worker)
+        return answer, error
+
+    def close(self):
+        """Stop every worker, including those busy with a question."""
+        with self._lock:
+            self._closed = True
+            workers = list(self._workers)
+            self._workers.clear()
+            self._idle = []
+        for worker in workers:
+            worker.close()
+
+
+def load_backend(skill_dir):
+    """Return answer(notebook_id, question) backed by the skill's ask_question module."""
+    from library_index import load_library_index
+
+    skill_dir = Path(skill_dir).resolve()
+    os.chdir(skill_dir)
+    sys.path.insert(0, str(skill_dir / 'scripts'))
+    import ask_question
+
+    library_path = skill_dir / 'data' / 'library.json'
+
+    def answer(notebook_id, question):
+        # The index is reloaded only when library.json changes
+        for notebook in load_library_index(library_path).notebooks:
+            if notebook.get('id') == notebook_id:
+                break
+        else:
+            raise ValueError(f"Notebook not found in library: {notebook_id}")
+        result = ask_question.ask_notebooklm(question, notebook['url'])
+        if not result:
+            raise RuntimeError('NotebookLM returned no answer')
+        return result
+
+    return answer
+
+
+def serve(skill_dir):
+    """Answer framed requests on stdin until it closes."""
+    # Keep the real stdout for frames; anything the skill prints goes to stderr
+    frames_out = os.fdopen(os.dup(sys.stdout.fileno()), 'wb')
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    frames_in = sys.stdin.buffer
+
+    try:
+        answer = load_backend(skill_dir)
+    except Exception as e:
+        write_frame(frames_out, {'error': f"cannot load the NotebookLM skill: {e}"})
+        return 1
+    write_frame(frames_out, {'ready': True})
+
+    while True:
+        request = read_frame(frames_in)
+        if request is None:
+            return 0
+        response = {'id': request.get('id')}
+        try:
+            response['answer'] = answer(request['notebook_id'], request['question'])
+        except Exception as e:
+            response['error'] = f"Failed to query notebook: {e}"
+        write_frame(frames_out, response)
+
+
+def main():
+    """
+    Usage: python notebooklm_worker.py --serve <notebooklm_skill_dir>
+    Started by review_document.py --worker; speaks frames on stdin/stdout.
+    """
+    if len(sys.argv) < 3 or sys.argv[1] != '--serve':
+        print("Usage: python notebooklm_worker.py --serve <notebooklm_skill_dir>", file=sys.stderr)
+        sys.exit(1)
+    sys.exit(serve(sys.argv[2]))
+
+
+if __name__ == '__main__':
+    main()
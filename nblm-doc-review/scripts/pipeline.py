@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+In-process review pipeline.
+Chains extract_content, notebook_selector and compliance_checker as plain
+function calls that pass text objects directly, so a review starts no
+extra interpreters and has no limit on document size.
+"""
+
+import threading
+from pathlib import Path
+
+from compliance_checker import iter_requirements, analyze_compliance
+from document_index import DocumentIndex
+from extract_content import iter_document_paragraphs, read_document
+from notebook_selector import count_keywords, select_for_document
+from requirement_store import RequirementStore
+
+# Prefix extraction for notebook selection: rankings are compared every
+# KEYWORD_CHECK_CHARS characters and are stable once the top
+# STABLE_TOP_KEYWORDS keywords repeat STABLE_CHECKS times in a row
+PREFIX_MAX_CHARS = 500000
+KEYWORD_CHECK_CHARS = 16384
+STABLE_TOP_KEYWORDS = 20
+STABLE_CHECKS = 3
+
+
+def _extraction_error(error):
+    if isinstance(error, ImportError):
+        return "Failed to extract document: PyPDF2 not installed. Install with: pip install PyPDF2"
+    return f"Failed to extract document: {str(error)}"
+
+
+def extract_document(file_path, use_cache=True):
+    """Extract text content from a document; returns (text, error)."""
+    if not Path(file_path).exists():
+        return None, f"Failed to extract document: File not found: {file_path}"
+
+    try:
+        content = read_document(file_path, use_cache)
+    except Exception as e:
+        return None, _extraction_error(e)
+
+    return content.strip(), None
+
+
+class BackgroundExtraction:
+    """Finishes consuming a document's paragraph stream in a background thread."""
+
+    def __init__(self, paragraphs, remaining):
+        self.paragraphs = paragraphs
+        self.error = None
+        self.thread = threading.Thread(target=self._run, args=(remaining,), daemon=True)
+        self.thread.start()
+
+    def _run(self, remaining):
+        try:
+            for paragraph in remaining:
+                self.paragraphs.append(paragraph)
+        except Exception as e:
+            self.error = _extraction_error(e)
+
+    def result(self):
+        """Wait for the full text; returns (text, error) like extract_document."""
+        self.thread.join()
+        if self.error:
+            return None, self.error
+        return '\n'.join(self.paragraphs).strip(), None
+
+
+def extract_prefix(file_path, max_chars=PREFIX_MAX_CHARS, max_pages=None,
+                   stable_keywords=True, use_cache=True):
+    """
+    Extract just enough of a document to select notebooks.
+    Reading stops after max_chars characters, after max_pages PDF pages, or
+    (with stable_keywords) once the top keyword ranking stops changing;
+    None disables a limit. The rest of the document keeps extracting in a
+    background thread from where the prefix stopped.
+    Returns (prefix_text, background, error); background.result() gives
+    the full text once it is needed.
+    """
+    if not Path(file_path).exists():
+        return None, None, f"Failed to extract document: File not found: {file_path}"
+
+    is_pdf = Path(file_path).suffix.lower() == '.pdf'
+    paragraphs = []
+    try:
+        stream = iter_document_paragraphs(file_path, use_cache)
+        chars = 0
+        next_check = KEYWORD_CHECK_CHARS
+        counts = None
+        ranking = None
+        unchanged = 0
+
+        for paragraph in stream:
+            paragraphs.append(paragraph)
+            chars += len(paragraph) + 1
+
+            if stable_keywords:
+                counts = count_keywords(paragraph, counts)
+                if chars >= next_check:
+                    next_check = chars + KEYWORD_CHECK_CHARS
+                    top = [word for word, _ in counts.most_common(STABLE_TOP_KEYWORDS)]
+                    unchanged = unchanged + 1 if top == ranking else 0
+                    ranking = top
+                    if unchanged >= STABLE_CHECKS:
+                        break
+
+            if max_chars is not None and chars >= max_chars:
+                break
+            if max_pages is not None and is_pdf and len(paragraphs) >= max_pages:
+                break
+    except Exception as e:
+        return None, None, _extraction_error(e)
+
+    prefix = '\n'.join(paragraphs).strip()
+    return prefix, BackgroundExtraction(paragraphs, stream), None
+
+
+def select_relevant_notebooks(document_content, threshold=5, library_path=None, top_k=None):
+    """Select notebooks relevant to the document text; returns (selection, error)."""
+    selection, error = select_for_document(document_content, threshold, library_path, top_k)
+    if error:
+        return None, f"Failed to select notebooks: {error}"
+    return selection, None
+
+
+def parse_answer(answer):
+    """Parse a notebook answer's requirements into a compact store."""
+    return RequirementStore.from_requirements(iter_requirements(answer))
+
+
+def analyze_answers(answers, document_content):
+    """
+    Check a document against the requirements in several notebook answers.
+    The document is indexed once and shared by every answer; each answer's
+    requirements are parsed into a compact store. Returns the merged
+    analyze_compliance results, or None when there are no answers.
+    """
+    return analyze_stores((parse_answer(answer) for answer in answers), document_content)
+
+
+def analyze_stores(stores, document_content):
+    """
+    Check a document against already parsed requirement stores; see
+    analyze_answers. Stores can be reused for the next document once the
+    results for this one have been written out.
+    """
+    index = DocumentIndex(document_content)
+    combined_results = None
+
+    for requirements in stores:
+        # Merged results refer to the store's records instead of copying them
+        results = analyze_compliance(requirements, index)
+
+        if combined_results is None:
+            combined_results = results
+            continue
+
+        combined_results['total'] += results['total']
+        combined_results['found'] += results['found']
+        combined_results['missing'] += results['missing']
+
+        for category, cat_data in results['by_category'].items():
+            if category not in combined_results['by_category']:
+                combined_results['by_category'][category] = cat_data
+            else:
+                combined = combined_results['by_category'][category]
+                combined['total'] += cat_data['total']
+                combined['found'] += cat_data['found']
+                combined['missing'] += cat_data['missing']
+                combined['requirements'].extend(cat_data['requirements'])
+
+    return combined_results
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Stage and query tracing for reviews.
+Each finished stage and notebook query appends one JSON line to a trace
+file, tagged with a run id, so traces from many runs can share a file and
+be aggregated. Stages record wall and CPU time (the process and its child
+processes), peak RSS and the bytes they processed; a disabled Profiler
+records nothing.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; CPU times then cover this process only
+    resource = None
+
+
+def _cpu_times():
+    """Return (process CPU seconds, finished child processes' CPU seconds)."""
+    if resource is None:
+        return time.process_time(), 0.0
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime, children.ru_utime + children.ru_stime
+
+
+def _maxrss_kb(who):
+    if resource is None:
+        return None
+    maxrss = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return maxrss // 1024 if sys.platform == 'darwin' else maxrss
+
+
+def _reset_peak_rss():
+    """Restart the kernel's peak RSS count for this process; False where unsupported."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_kb():
+    """Peak RSS since the last reset (Linux) or since the process started."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return _maxrss_kb(resource.RUSAGE_SELF) if resource else None
+
+
+class Profiler:
+    """
+    Appends stage and query records to a JSON lines trace.
+    begin() starts a numbered stage and ends the previous one; end() takes
+    extra fields such as byte counts. Safe to call query() from threads.
+    """
+
+    def __init__(self, path=None, **run_fields):
+        self.path = path
+        self.enabled = path is not None
+        self.run_id = uuid.uuid4().hex[:12]
+        self._lock = threading.Lock()
+        self._stage = None
+        self._out = None
+        # Resetting the peak between stages also resets ru_maxrss, so keep the run's own
+        self._max_rss_kb = None
+        if not self.enabled:
+            return
+
+        self._out = open(path, 'a', encoding='utf-8')
+        self._run_start = time.perf_counter()
+        self._run_cpu = _cpu_times()
+        record = {'type': 'run', 'started': time.time(), 'pid': os.getpid(), 'argv': sys.argv[1:]}
+        record.update(run_fields)
+        self._write(record)
+
+    def _write(self, record):
+        record = dict({'run_id': self.run_id}, **record)
+        with self._lock:
+            self._out.write(json.dumps(record) + '\n')
+            self._out.flush()
+
+    def begin(self, step, name):
+        """Start timing stage number step; ends any stage still open."""
+        self.end()
+        if not self.enabled:
+            return
+        self._stage = {
+            'step': step,
+            'stage': name,
+            'started': time.time(),
+            'start': time.perf_counter(),
+            'cpu': _cpu_times(),
+            'stage_peak': _reset_peak_rss()
+        }
+
+    def end(self, **fields):
+        """Finish the open stage, recording fields with it."""
+        stage, self._stage = self._stage, None
+        if stage is None:
+            return
+
+        cpu, children_cpu = _cpu_times()
+        peak_rss_kb = self._track_peak()
+        record = {
+            'type': 'stage',
+            'step': stage['step'],
+            'stage': stage['stage'],
+            'started': stage['started'],
+            'wall_s': round(time.perf_counter() - stage['start'], 6),
+            'cpu_s': round(cpu - stage['cpu'][0], 6),
+            'children_cpu_s': round(children_cpu - stage['cpu'][1], 6),
+            'peak_rss_kb': peak_rss_kb,
+            # 'stage' when the peak was reset at the start of the stage
+            'peak_rss_scope': 'stage' if stage['stage_peak'] else 'process'
+        }
+        record.update(fields)
+        self._write(record)
+
+    def _track_peak(self):
+        peak_rss_kb = _peak_rss_kb()
+        if peak_rss_kb is not None:
+            self._max_rss_kb = max(self._max_rss_kb or 0, peak_rss_kb)
+        return peak_rss_kb
+
+    def query(self, notebook, question, answer, error, source, wall_s, thread_cpu_s):
+        """Record one notebook query, from whichever thread ran it."""
+        if not self.enabled:
+            return
+        record = {
+            'type': 'query',
+            'notebook_id': notebook['id'],
+            'notebook': notebook['name'],
+            'source': source,
+            'wall_s': round(wall_s, 6),
+            'thread_cpu_s': round(thread_cpu_s, 6),
+            'bytes_in': len(question.encode('utf-8')),
+            'bytes_out': len(answer.encode('utf-8')) if answer else 0
+        }
+        if error:
+            record['error'] = error
+        self._write(record)
+
+    def close(self):
+        """End any open stage and record totals for the run."""
+        if not self.enabled or self._out is None:
+            return
+        self.end()
+        cpu, children_cpu = _cpu_times()
+        self._track_peak()
+        self._write({
+            'type': 'total',
+            'wall_s': round(time.perf_counter() - self._run_start, 6),
+            'cpu_s': round(cpu - self._run_cpu[0], 6),
+            'children_cpu_s': round(children_cpu - self._run_cpu[1], 6),
+            'max_rss_kb': self._max_rss_kb,
+            'children_max_rss_kb': _maxrss_kb(resource.RUSAGE_CHILDREN) if resource else None
+        })
+        self._out.close()
+        self._out = None
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+BM25 relevance scoring of requirements against document passages.
+An optional alternative to the keyword-overlap rule in compliance_checker:
+every requirement gets a normalized score and its best-matching passage,
+so a single coverage threshold can be tuned offline.
+"""
+
+import math
+import re
+from collections import Counter
+
+TERM_PATTERN = re.compile(r'\b[a-z]{3,}\b')
+
+STOPWORDS = {
+    'you', 'must', 'should', 'shall', 'need', 'required', 'requires',
+    'ensure', 'establish', 'maintain', 'implement', 'apply', 'the', 'and',
+    'for', 'with', 'that', 'this', 'from', 'have', 'has', 'been', 'are',
+    'was', 'were', 'will', 'any', 'all', 'such', 'which', 'where', 'when'
+}
+
+
+def tokenize(text):
+    """Split lowercased text into scoring terms."""
+    return [t for t in TERM_PATTERN.findall(text) if t not in STOPWORDS]
+
+
+class BM25Scorer:
+    """Precomputed BM25 term statistics over the passages of one document."""
+
+    def __init__(self, index, k1=1.5, b=0.75, max_passage_words=120):
+        self.text = index.text
+        self.k1 = k1
+        self.b = b
+
+        # Passages are lines; very long lines (common in PDF text) are cut
+        # into windows of max_passage_words words
+        self.passages = []
+        for line_no, start in enumerate(index.line_starts):
+            if line_no + 1 < len(index.line_starts):
+                end = index.line_starts[line_no + 1] - 1
+            else:
+                end = len(self.text)
+            self._add_passages(start, end, max_passage_words)
+
+        # Sparse term vectors per passage and document frequencies
+        self.vectors = []
+        self.lengths = []
+        doc_freq = Counter()
+        for start, end in self.passages:
+            vector = Counter(tokenize(self.text[start:end]))
+            self.vectors.append(vector)
+            self.lengths.append(sum(vector.values()))
+            doc_freq.update(vector.keys())
+
+        self.passage_count = len(self.passages)
+        self.avg_length = (sum(self.lengths) / self.passage_count) if self.passage_count else 0
+        self.idf = {
+            term: math.log(1 + (self.passage_count - df + 0.5) / (df + 0.5))
+            for term, df in doc_freq.items()
+        }
+
+        # Inverted postings: term -> [(passage_id, term_frequency)]
+        self.postings = {}
+        for passage_id, vector in enumerate(self.vectors):
+            for term, tf in vector.items():
+                self.postings.setdefault(term, []).append((passage_id, tf))
+
+        self._weights = {}
+
+    def _add_passages(self, start, end, max_words):
+        words = [m.start() for m in re.finditer(r'\S+', self.text[start:end])]
+        if not words:
+            return
+        for i in range(0, len(words), max_words):
+            chunk_start = start + words[i]
+            chunk_end = start + words[i + max_words] if i + max_words < len(words) else end
+            self.passages.append((chunk_start, chunk_end))
+
+    def term_weights(self, term):
+        """Return [(passage_id, bm25_weight)] for a term, cached across queries."""
+        weights = self._weights.get(term)
+        if weights is None:
+            idf = self.idf.get(term, 0.0)
+            weights = []
+            for passage_id, tf in self.postings.get(term, []):
+                norm = 1 - self.b + self.b * self.lengths[passage_id] / self.avg_length
+                weights.append((passage_id, idf * tf * (self.k1 + 1) / (tf + self.k1 * norm)))
+            self._weights[term] = weights
+        return weights
+
+    def max_score(self, terms):
+        """
+        Upper bound on the BM25 score a passage can reach for these terms.
+        Terms absent from the document count at the rarest possible idf.
+        """
+        unseen_idf = math.log(1 + (self.passage_count + 0.5) / 0.5)
+        upper = (self.k1 + 1) * sum(self.idf.get(term, unseen_idf) for term in terms)
+        return upper or 1.0
+
+    def best_passage(self, requirement_text):
+        """
+        Score a requirement against every passage.
+        Returns (normalized_score, passage_id); passage_id is None if no term matches.
+        """
+        terms = set(tokenize(requirement_text.lower()))
+        if not terms:
+            return 0.0, None
+
+        scores = {}
+        for term in terms:
+            for passage_id, weight in self.term_weights(term):
+                scores[passage_id] = scores.get(passage_id, 0.0) + weight
+
+        if not scores:
+            return 0.0, None
+
+        passage_id = max(scores, key=scores.get)
+        return scores[passage_id] / self.max_score(terms), passage_id
+
+    def passage_span(self, passage_id, limit=None):
+        """Return (start, end) offsets of the passage, trimmed and capped at limit."""
+        start, end = self.passages[passage_id]
+        while start < end and self.text[start].isspace():
+            start += 1
+        while end > start and self.text[end - 1].isspace():
+            end -= 1
+        if limit is not None:
+            end = min(end, start + limit)
+        return start, end
+
+    def passage_text(self, passage_id, limit=150):
+        """Return the passage text, shortened to limit characters."""
+        start, end = self.passage_span(passage_id)
+        text = self.text[start:end]
+        if len(text) > limit:
+            text = text[:limit - 3] + '...'
+        return text
+
+    def score_requirements(self, requirements):
+        """
+        Score all requirements in one batched pass; term weights are
+        computed once and shared by every requirement that uses the term.
+        Returns a list of {'score', 'passage_id', 'passage'} in requirement order.
+        """
+        scored = []
+        for req in requirements:
+            score, passage_id = self.best_passage(req['requirement'])
+            scored.append({
+                'score': round(score, 4),
+                'passage_id': passage_id,
+                'passage': self.passage_text(passage_id) if passage_id is not None else None
+            })
+        return scored
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Compact, array-backed storage for large requirement sets.
+Categories are interned to small integer IDs, check results live in flat
+arrays, and evidence is kept as (start, end) offsets into the checked
+document instead of copied snippet strings.
+"""
+
+from array import array
+
+
+class Requirement:
+    """
+    Lightweight view of one stored requirement.
+    Supports the same keys as the requirement dicts from parse_requirements
+    ('category', 'requirement', 'found', 'evidence', 'score').
+    """
+
+    __slots__ = ('store', 'index')
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    def __getitem__(self, key):
+        store = self.store
+        i = self.index
+        if key == 'category':
+            return store.categories[store.category_ids[i]]
+        if key == 'requirement':
+            return store.texts[i]
+        if key == 'found':
+            return bool(store.found[i])
+        if key == 'evidence':
+            return store.evidence(i)
+        if key == 'score':
+            return store.scores[i] if store.scores is not None else None
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __repr__(self):
+        return f"Requirement({self.index}, {self['requirement'][:40]!r})"
+
+
+class RequirementStore:
+    """Requirements in parallel arrays; results refer to them by index."""
+
+    def __init__(self):
+        self.categories = []
+        self._category_lookup = {}
+        self.category_ids = array('I')
+        self.texts = []
+
+        # Results of the last analysis
+        self.document = None
+        self.found = bytearray()
+        self.scores = None
+        self.evidence_spans = array('q')
+        self.evidence_bounds = array('q', [0])
+
+    @classmethod
+    def from_requirements(cls, requirements):
+        """Build a store from requirement dicts (or any iterable of them)."""
+        store = cls()
+        for req in requirements:
+            store.add(req['category'], req['requirement'])
+        return store
+
+    def add(self, category, requirement_text):
+        """Append a requirement and return its index."""
+        category_id = self._category_lookup.get(category)
+        if category_id is None:
+            category_id = len(self.categories)
+            self.categories.append(category)
+            self._category_lookup[category] = category_id
+
+        self.category_ids.append(category_id)
+        self.texts.append(requirement_text)
+        self.found.append(0)
+        return len(self.texts) - 1
+
+    def __len__(self):
+        return len(self.texts)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.texts)
+        if not 0 <= index < len(self.texts):
+            raise IndexError(index)
+        return Requirement(self, index)
+
+    def __iter__(self):
+        for index in range(len(self.texts)):
+            yield Requirement(self, index)
+
+    def begin_results(self, document_text, scored=False):
+        """
+        Clear results before checking every requirement against a document.
+        Evidence offsets recorded afterwards refer to document_text.
+        """
+        self.document = document_text
+        self.found = bytearray(len(self.texts))
+        self.scores = array('d') if scored else None
+        self.evidence_spans = array('q')
+        self.evidence_bounds = array('q', [0])
+
+    def record(self, index, found, spans, score=None):
+        """Record the result for the next requirement, in index order."""
+        if index != len(self.evidence_bounds) - 1:
+            raise ValueError("Results must be recorded in requirement order")
+
+        self.found[index] = 1 if found else 0
+        if self.scores is not None:
+            self.scores.append(score or 0.0)
+        for start, end in spans:
+            self.evidence_spans.append(start)
+            self.evidence_spans.append(end)
+        self.evidence_bounds.append(len(self.evidence_spans))
+
+    def evidence(self, index):
+        """Materialize the evidence snippets of a requirement."""
+        if index + 1 >= len(self.evidence_bounds):
+            return []
+        spans = self.evidence_spans
+        return [
+            self.document[spans[i]:spans[i + 1]]
+            for i in range(self.evidence_bounds[index], self.evidence_bounds[index + 1], 2)
+        ]
@@ -5,103 +5,176 @@ Reviews documents against NotebookLM notebooks and generates comprehensive repor
 """
 
 import sys
-import json
 import os
+import atexit
+import shutil
+import signal
 import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
 
+from answer_cache import DEFAULT_TTL, AnswerCache
+from notebooklm_worker import WorkerPool, WorkerUnavailable
+from profiling import Profiler
 # Import compliance checker functions
 from compliance_checker import (
-    parse_requirements,
-    analyze_compliance,
-    generate_gap_report,
-    generate_recommendations
+    write_gap_report,
+    write_recommendations,
+    ReportWriter
 )
+# Extraction, notebook selection and analysis run in-process
+from pipeline import (
+    PREFIX_MAX_CHARS,
+    extract_document,
+    extract_prefix,
+    select_relevant_notebooks,
+    analyze_answers
+)
+
+# Notebook queries run concurrently, at most this many at a time
+DEFAULT_MAX_PARALLEL = 4
+
+# Seconds before a notebook query is killed
+DEFAULT_QUERY_TIMEOUT = 600
+
+# Question asked of every notebook, by --depth
+QUESTIONS = {
+    'quick': "What are the key requirements covered in this documentation? Provide a high-level summary.",
+    'detailed': "What are the comprehensive requirements covered in this documentation? Provide detailed information including all obligations, procedures, and standards."
+}
+
+# Commands still running, so cancellation can kill them
+_running = set()
+_running_lock = threading.Lock()
+_cancelled = threading.Event()
 
 
-def run_command(cmd, input_text=None):
-    """Run shell command and return output"""
+def _kill_process_group(proc):
+    """Kill a command started by run_command along with its children."""
     try:
-        result = subprocess.run(
+        os.killpg(proc.pid, signal.SIGKILL)
+    except (AttributeError, OSError):
+        # No process groups on this platform, or the group already exited
+        proc.kill()
+
+
+def run_command(cmd, input_text=None, timeout=None):
+    """
+    Run shell command and return output.
+    The command runs in its own session so that a timeout or
+    cancel_commands() kills everything it started, not just the shell.
+    """
+    if _cancelled.is_set():
+        return '', 'Cancelled', 1
+    try:
+        proc = subprocess.Popen(
             cmd,
             shell=True,
-            capture_output=True,
+            stdin=subprocess.PIPE if input_text is not None else None,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
             text=True,
-            input=input_text
+            start_new_session=True
         )
-        return result.stdout.strip(), result.stderr.strip(), result.returncode
     except Exception as e:
         return '', str(e), 1
 
+    with _running_lock:
+        _running.add(proc)
+    try:
+        stdout, stderr = proc.communicate(input_text, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        _kill_process_group(proc)
+        proc.wait()
+        proc.stdout.close()
+        proc.stderr.close()
+        return '', f"Timed out after {timeout}s", 1
+    finally:
+        with _running_lock:
+            _running.discard(proc)
 
-def extract_document(file_path):
-    """Extract text content from document"""
-    script_dir = Path(__file__).parent
-    extract_script = script_dir / 'extract_content.py'
-
-    stdout, stderr, code = run_command(f'python3 "{extract_script}" "{file_path}"')
-
-    if code != 0:
-        return None, f"Failed to extract document: {stderr}"
+    if _cancelled.is_set() and proc.returncode != 0:
+        return '', 'Cancelled', 1
+    return stdout.strip(), stderr.strip(), proc.returncode
 
-    return stdout, None
 
+def cancel_commands():
+    """Refuse new commands and kill those still running."""
+    _cancelled.set()
+    with _running_lock:
+        running = list(_running)
+    for proc in running:
+        _kill_process_group(proc)
 
-def select_relevant_notebooks(document_content, threshold=5):
-    """Select relevant notebooks based on document content"""
-    script_dir = Path(__file__).parent
-    selector_script = script_dir / 'notebook_selector.py'
 
-    # Pass document content as argument (escaped for shell)
-    stdout, stderr, code = run_command(
-        f'python3 "{selector_script}" "$DOC_CONTENT" --threshold {threshold}',
-        input_text=None
+def resolve_notebooklm_skill_dir():
+    """Locate the NotebookLM skill; returns (path, error)."""
+    notebooklm_env = os.environ.get('NOTEBOOKLM_SKILL_DIR')
+    if notebooklm_env:
+        return Path(notebooklm_env).expanduser(), None
+
+    # Prefer sibling skill in a flat repo: notebooklm
+    skills_dir = Path(__file__).resolve().parents[2]
+    candidate = skills_dir / 'notebooklm'
+    if candidate.exists():
+        return candidate, None
+    return None, (
+        "NotebookLM skill directory not found. Set NOTEBOOKLM_SKILL_DIR "
+        "or place NotebookLM at notebooklm."
     )
 
-    # Alternative: write to temp file
-    import tempfile
-    with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as f:
-        f.write(document_content)
-        temp_path = f.name
 
-    try:
-        with open(temp_path, 'r') as f:
-            doc_text = f.read()
-
-        cmd = f'python3 "{selector_script}" "{doc_text}" --threshold {threshold}'
-        stdout, stderr, code = run_command(cmd)
-
-        if code != 0:
-            return None, f"Failed to select notebooks: {stderr}"
+def query_notebook(notebook_id, question, timeout=None, cache=None, stamp='', workers=None):
+    """
+    Query a specific NotebookLM notebook, answering from cache when possible.
+    With a WorkerPool the question goes to a long-lived worker; without one,
+    or if no worker can start, the skill is run once for this question.
+    """
+    answer, error, _ = _query_notebook(notebook_id, question, timeout, cache, stamp, workers)
+    return answer, error
+
+
+def _query_notebook(notebook_id, question, timeout, cache, stamp, workers):
+    """query_notebook, also returning where the answer came from: cache, worker or process."""
+    if cache is not None:
+        answer = cache.get(notebook_id, question, stamp)
+        if answer is not None:
+            return answer, None, 'cache'
+
+    answer = error = None
+    source = 'worker'
+    if workers is not None:
+        try:
+            answer, error = workers.ask(notebook_id, question, timeout)
+        except WorkerUnavailable:
+            pass
+
+    if answer is None and error is None:
+        source = 'process'
+        notebooklm_path, error = resolve_notebooklm_skill_dir()
+        if not error:
+            answer, error = ask_with_process(notebooklm_path, notebook_id, question, timeout)
+    if not error and not answer.strip():
+        error = "Failed to query notebook: NotebookLM returned an empty answer"
+    if error:
+        # Failures, including empty answers, are never cached
+        return None, error, source
 
-        result = json.loads(stdout)
-        return result, None
-    finally:
-        Path(temp_path).unlink()
+    if cache is not None:
+        cache.put(notebook_id, question, answer, stamp)
+    return answer, None, source
 
 
-def query_notebook(notebook_id, question):
-    """Query a specific NotebookLM notebook"""
-    notebooklm_env = os.environ.get('NOTEBOOKLM_SKILL_DIR')
-    if notebooklm_env:
-        notebooklm_path = Path(notebooklm_env).expanduser()
-    else:
-        # Prefer sibling skill in a flat repo: notebooklm
-        skills_dir = Path(__file__).resolve().parents[2]
-        candidate = skills_dir / 'notebooklm'
-        if candidate.exists():
-            notebooklm_path = candidate
-        else:
-            return None, (
-                "NotebookLM skill directory not found. Set NOTEBOOKLM_SKILL_DIR "
-                "or place NotebookLM at notebooklm."
-            )
+def ask_with_process(notebooklm_path, notebook_id, question, timeout=None):
+    """Ask one question by running the skill's ask_question.py; returns (answer, error)."""
     ask_script = notebooklm_path / 'scripts' / 'run.py'
 
     cmd = f'cd "{notebooklm_path}" && python3 "{ask_script}" ask_question.py --question "{question}" --notebook-id "{notebook_id}"'
 
-    stdout, stderr, code = run_command(cmd)
+    stdout, stderr, code = run_command(cmd, timeout=timeout)
 
     if code != 0:
         return None, f"Failed to query notebook: {stderr}"
@@ -120,13 +193,67 @@ def query_notebook(notebook_id, question):
         if answer_start and line.strip():
             answer_lines.append(line)
 
+    if not answer_start:
+        # e.g. the skill printed a login prompt instead of asking
+        last_line = next((line.strip() for line in reversed(lines) if line.strip()), '')
+        return None, f"Failed to query notebook: no answer in NotebookLM output: {last_line or '(no output)'}"
     return '\n'.join(answer_lines), None
 
 
-def generate_report(document_path, document_content, notebooks, queries, output_options):
-    """Generate comprehensive alignment report with real compliance analysis"""
-    report = []
+def query_notebooks(notebooks, question, max_parallel=DEFAULT_MAX_PARALLEL,
+                    timeout=DEFAULT_QUERY_TIMEOUT, on_result=None, cache=None, workers=None,
+                    profiler=None):
+    """
+    Ask every notebook the same question, at most max_parallel at a time.
+    Returns [(answer, error)] in notebook order, however the queries finish;
+    on_result(notebook, answer, error) is called as each one completes.
+    With an AnswerCache, cached answers are reused and new ones stored;
+    with a WorkerPool, questions go to long-lived workers; with a Profiler,
+    each query's time and answer size are recorded.
+    On KeyboardInterrupt pending queries are dropped and running ones killed.
+    """
+    if not notebooks:
+        return []
+
+    def ask(nb):
+        start, thread_start = time.perf_counter(), time.thread_time()
+        answer, error, source = _query_notebook(
+            nb['id'], question, timeout, cache, nb['stamp'], workers)
+        if profiler is not None:
+            profiler.query(nb, question, answer, error, source,
+                           time.perf_counter() - start, time.thread_time() - thread_start)
+        return answer, error
+
+    results = [None] * len(notebooks)
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_parallel, len(notebooks))))
+    futures = {executor.submit(ask, nb): i for i, nb in enumerate(notebooks)}
+    try:
+        for future in as_completed(futures):
+            i = futures[future]
+            results[i] = future.result()
+            if on_result:
+                on_result(notebooks[i], *results[i])
+    except KeyboardInterrupt:
+        for future in futures:
+            future.cancel()
+        cancel_commands()
+        if workers is not None:
+            workers.close()
+        raise
+    finally:
+        executor.shutdown(wait=True)
+
+    return results
+
 
+def write_report(report, document_path, document_content, notebooks, queries, output_options,
+                 results=None):
+    """
+    Append the alignment report to report, a list of lines or a ReportWriter.
+    With a ReportWriter each section reaches the file as soon as it is built.
+    results are analyze_answers results computed elsewhere; by default the
+    document is analyzed against the query answers here.
+    """
     # Header
     report.append("# Document Compliance Review Report")
     report.append(f"\n**Document:** {document_path}")
@@ -150,34 +277,9 @@ def generate_report(document_path, document_content, notebooks, queries, output_
 
     report.append("\n---\n")
 
-    # Analyze compliance for each notebook
-    all_requirements = []
-    combined_results = None
-
-    for query in queries:
-        # Parse requirements from this notebook
-        requirements = parse_requirements(query['answer'])
-        all_requirements.extend(requirements)
-
-        # Analyze compliance
-        results = analyze_compliance(requirements, document_content)
-
-        if combined_results is None:
-            combined_results = results
-        else:
-            # Merge results
-            combined_results['total'] += results['total']
-            combined_results['found'] += results['found']
-            combined_results['missing'] += results['missing']
-
-            for category, cat_data in results['by_category'].items():
-                if category not in combined_results['by_category']:
-                    combined_results['by_category'][category] = cat_data
-                else:
-                    combined_results['by_category'][category]['total'] += cat_data['total']
-                    combined_results['by_category'][category]['found'] += cat_data['found']
-                    combined_results['by_category'][category]['missing'] += cat_data['missing']
-                    combined_results['by_category'][category]['requirements'].extend(cat_data['requirements'])
+    # Analyze compliance against the requirements from every notebook
+    if results is None:
+        results = analyze_answers([query['answer'] for query in queries], document_content)
 
     # Query Results (detailed requirements)
     report.append("## Detailed Requirements")
@@ -188,15 +290,18 @@ def generate_report(document_path, document_content, notebooks, queries, output_
         report.append("\n---\n")
 
     # Generate real gap analysis and recommendations
-    if combined_results:
+    if results:
         if 'gap' in output_options or 'all' in output_options:
-            gap_report = generate_gap_report(combined_results)
-            report.append(gap_report)
+            write_gap_report(results, report)
 
         if 'recommendations' in output_options or 'all' in output_options:
-            recommendations = generate_recommendations(combined_results)
-            report.append(recommendations)
+            write_recommendations(results, report)
+
 
+def generate_report(document_path, document_content, notebooks, queries, output_options):
+    """Generate comprehensive alignment report with real compliance analysis"""
+    report = []
+    write_report(report, document_path, document_content, notebooks, queries, output_options)
     return '\n'.join(report)
 
 
@@ -208,12 +313,36 @@ def main():
         print("  --output gap,alignment,recommendations,all  (default: all)")
         print("  --depth quick|detailed  (default: detailed)")
         print("  --threshold N  (notebook relevance threshold, default: 5)")
+        print("  --top-k N  (query at most the N most relevant notebooks)")
+        print(f"  --max-parallel N  (notebooks queried at once, default: {DEFAULT_MAX_PARALLEL})")
+        print(f"  --query-timeout SECONDS  (kill a notebook query after this long, 0 for no limit, default: {DEFAULT_QUERY_TIMEOUT})")
+        print("  --no-echo  (write the report file without printing it)")
+        print("  --no-cache  (re-extract the document instead of using the extraction cache)")
+        print("  --worker  (ask questions through long-lived NotebookLM workers instead of a process per question)")
+        print("  --no-answer-cache  (ask every notebook again instead of reusing cached answers)")
+        print(f"  --answer-ttl HOURS  (reuse cached answers up to this old, default: {DEFAULT_TTL // 3600})")
+        print("  --fast-select  (select notebooks from a document prefix; full extraction continues in the background)")
+        print("  --select-chars N  (prefix size in characters for --fast-select, implies it)")
+        print("  --select-pages N  (prefix size in pages for --fast-select, implies it; PDF documents only)")
+        print("  --profile [PATH]  (append per-stage and per-query timings as JSON lines, default: <document>_profile.jsonl)")
         sys.exit(1)
 
     document_path = sys.argv[1]
     output_options = ['all']
     depth = 'detailed'
     threshold = 5
+    top_k = None
+    max_parallel = DEFAULT_MAX_PARALLEL
+    query_timeout = DEFAULT_QUERY_TIMEOUT
+    echo = '--no-echo' not in sys.argv
+    use_cache = '--no-cache' not in sys.argv
+    use_answer_cache = '--no-answer-cache' not in sys.argv
+    use_workers = '--worker' in sys.argv
+    answer_ttl = DEFAULT_TTL
+    fast_select = '--fast-select' in sys.argv
+    select_chars = PREFIX_MAX_CHARS
+    select_pages = None
+    profile_path = None
 
     # Parse options
     if '--output' in sys.argv:
@@ -231,20 +360,82 @@ def main():
         if idx + 1 < len(sys.argv):
             threshold = int(sys.argv[idx + 1])
 
+    if '--top-k' in sys.argv:
+        idx = sys.argv.index('--top-k')
+        if idx + 1 < len(sys.argv):
+            top_k = int(sys.argv[idx + 1])
+
+    if '--max-parallel' in sys.argv:
+        idx = sys.argv.index('--max-parallel')
+        if idx + 1 < len(sys.argv):
+            max_parallel = int(sys.argv[idx + 1])
+
+    if '--query-timeout' in sys.argv:
+        idx = sys.argv.index('--query-timeout')
+        if idx + 1 < len(sys.argv):
+            query_timeout = float(sys.argv[idx + 1]) or None
+
+    if '--answer-ttl' in sys.argv:
+        idx = sys.argv.index('--answer-ttl')
+        if idx + 1 < len(sys.argv):
+            answer_ttl = float(sys.argv[idx + 1]) * 3600
+
+    if '--select-chars' in sys.argv:
+        idx = sys.argv.index('--select-chars')
+        if idx + 1 < len(sys.argv):
+            select_chars = int(sys.argv[idx + 1])
+            fast_select = True
+
+    if '--select-pages' in sys.argv:
+        idx = sys.argv.index('--select-pages')
+        if idx + 1 < len(sys.argv):
+            if Path(document_path).suffix.lower() == '.pdf':
+                select_pages = int(sys.argv[idx + 1])
+                fast_select = True
+            else:
+                print("⚠️  --select-pages only applies to PDF documents; ignoring it")
+
+    if '--profile' in sys.argv:
+        idx = sys.argv.index('--profile')
+        if idx + 1 < len(sys.argv) and not sys.argv[idx + 1].startswith('--'):
+            profile_path = sys.argv[idx + 1]
+        else:
+            profile_path = Path(document_path).stem + '_profile.jsonl'
+
+    # Totals are recorded however the review ends, including sys.exit()
+    profiler = Profiler(profile_path, document=document_path)
+    atexit.register(profiler.close)
+
     print(f"📄 Reviewing document: {document_path}")
     print(f"⚙️  Options: output={','.join(output_options)}, depth={depth}, threshold={threshold}\n")
 
     # Step 1: Extract document content
     print("1️⃣  Extracting document content...")
-    content, error = extract_document(document_path)
+    profiler.begin(1, 'extract')
+    background = None
+    if fast_select:
+        # Select from a prefix; the rest is extracted while notebooks are queried
+        content, background, error = extract_prefix(
+            document_path, select_chars, select_pages, use_cache=use_cache)
+    else:
+        content, error = extract_document(document_path, use_cache)
     if error:
         print(f"❌ {error}")
         sys.exit(1)
-    print(f"✅ Extracted {len(content)} characters\n")
+    if background:
+        print(f"✅ Read {len(content)} characters for notebook selection (extraction continues in background)\n")
+    else:
+        print(f"✅ Extracted {len(content)} characters\n")
+    try:
+        bytes_in = os.path.getsize(document_path)
+    except OSError:
+        bytes_in = None
+    profiler.end(bytes_in=bytes_in, chars_out=len(content), background=bool(background))
 
     # Step 2: Select relevant notebooks
     print("2️⃣  Selecting relevant notebooks...")
-    selection_result, error = select_relevant_notebooks(content, threshold)
+    profiler.begin(2, 'select')
+    selection_result, error = select_relevant_notebooks(content, threshold, top_k=top_k)
     if error:
         print(f"❌ {error}")
         sys.exit(1)
@@ -262,25 +453,51 @@ def main():
     for nb in notebooks:
         print(f"   - {nb['name']} (score: {nb['score']})")
     print()
+    profiler.end(chars_in=len(content), keywords=len(keywords), notebooks=len(notebooks))
 
     # Step 3: Query notebooks for requirements
     print("3️⃣  Querying notebooks for requirements...\n")
+    profiler.begin(3, 'query')
     queries = []
 
-    for nb in notebooks:
-        print(f"   Querying: {nb['name']}...")
+    # Craft question based on depth
+    question = QUESTIONS['quick'] if depth == 'quick' else QUESTIONS['detailed']
 
-        # Craft question based on depth
-        if depth == 'quick':
-            question = "What are the key requirements covered in this documentation? Provide a high-level summary."
+    def report_progress(nb, answer, error):
+        if error:
+            print(f"   ⚠️  Warning: {nb['name']}: {error}")
         else:
-            question = "What are the comprehensive requirements covered in this documentation? Provide detailed information including all obligations, procedures, and standards."
+            print(f"   ✅ {nb['name']}: received response ({len(answer)} chars)")
 
-        answer, error = query_notebook(nb['id'], question)
+    answer_cache = AnswerCache(ttl=answer_ttl) if use_answer_cache else None
+    workers = None
+    if use_workers:
+        skill_dir, error = resolve_notebooklm_skill_dir()
         if error:
-            print(f"   ⚠️  Warning: {error}")
-            continue
+            print(f"❌ {error}")
+            sys.exit(1)
+        workers = WorkerPool(skill_dir)
 
+    print(f"   Querying {len(notebooks)} notebook(s), up to {max_parallel} at a time...")
+    try:
+        results = query_notebooks(notebooks, question, max_parallel, query_timeout,
+                                  report_progress, answer_cache, workers, profiler)
+    except KeyboardInterrupt:
+        print("\n❌ Cancelled; stopped all notebook queries")
+        sys.exit(130)
+    finally:
+        if workers is not None:
+            workers.close()
+    if workers is not None and workers.error:
+        print(f"   ⚠️  NotebookLM worker unavailable ({workers.error}); used one process per question")
+    if answer_cache is not None and answer_cache.cache_dir is not None:
+        print(f"   Answer cache: {answer_cache.summary()}")
+    print()
+
+    # Keep notebook order so the report does not depend on which query finished first
+    for nb, (answer, error) in zip(notebooks, results):
+        if error:
+            continue
         queries.append({
             'notebook_name': nb['name'],
             'notebook_id': nb['id'],
@@ -288,7 +505,11 @@ def main():
             'answer': answer
         })
 
-        print(f"   ✅ Received response ({len(answer)} chars)\n")
+    profiler.end(
+        notebooks=len(notebooks),
+        answered=len(queries),
+        bytes_out=sum(len(query['answer'].encode('utf-8')) for query in queries)
+    )
 
     if not queries:
         print("❌ Failed to query any notebooks")
@@ -296,16 +517,42 @@ def main():
 
     # Step 4: Generate report
     print("4️⃣  Generating report...")
-    report = generate_report(document_path, content, notebooks, queries, output_options)
+    if background:
+        profiler.begin(4, 'extract_wait')
+        content, error = background.result()
+        if error:
+            print(f"❌ {error}")
+            sys.exit(1)
+        print(f"   Extracted {len(content)} characters")
+        profiler.end(chars_out=len(content))
+
+    # Analyze before writing so the trace separates analysis from report output
+    profiler.begin(4, 'analyze')
+    results = analyze_answers([query['answer'] for query in queries], content)
+    profiler.end(
+        chars_in=len(content),
+        bytes_in=sum(len(query['answer'].encode('utf-8')) for query in queries),
+        requirements=results['total'] if results else 0
+    )
 
-    # Save report
+    # Stream the report straight to disk instead of building it in memory
+    profiler.begin(4, 'report')
     output_file = Path(document_path).stem + '_alignment_report.md'
     with open(output_file, 'w') as f:
-        f.write(report)
+        write_report(ReportWriter(f), document_path, content, notebooks, queries, output_options,
+                     results=results)
+    profiler.end(bytes_out=os.path.getsize(output_file))
 
     print(f"✅ Report generated: {output_file}\n")
-    print("="*60)
-    print(report)
+    if echo:
+        print("="*60)
+        sys.stdout.flush()
+        with open(output_file, 'r') as f:
+            shutil.copyfileobj(f, sys.stdout)
+        print()
+    if profiler.enabled:
+        profiler.close()
+        print(f"⏱️  Profile appended to {profile_path}")
 
 
 if __name__ == '__main__':
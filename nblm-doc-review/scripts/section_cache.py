@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Incremental compliance checking keyed by section hashes.
+Documents are split into sections and each section's keyword hits are
+cached on disk by content hash, so a re-check only evaluates the sections
+that changed since the last run.
+"""
+
+import hashlib
+import json
+import os
+import re
+import zlib
+
+from compliance_checker import (
+    extract_keywords,
+    evaluate_keywords,
+    new_results,
+    record_result
+)
+from document_index import DocumentIndex
+
+CACHE_VERSION = 1
+
+# Headings always start a new section (markdown or numbered headings)
+HEADING_PATTERN = re.compile(r'^(#{1,6}\s+\S|\d+(\.\d+)*\.?\s+\S.{0,100}$)')
+
+# Long runs without headings are cut at content-defined boundaries, so an
+# inserted line only changes the section it lands in
+MIN_SECTION_LINES = 8
+MAX_SECTION_LINES = 256
+BOUNDARY_MODULUS = 32
+
+
+def split_sections(document_content):
+    """Split a document into sections; returns a list of (hash, text)."""
+    sections = []
+    current = []
+
+    def flush():
+        text = '\n'.join(current)
+        sections.append((hashlib.sha1(text.encode('utf-8')).hexdigest(), text))
+        current.clear()
+
+    for line in document_content.split('\n'):
+        if current and HEADING_PATTERN.match(line.strip()):
+            flush()
+        current.append(line)
+
+        if len(current) >= MAX_SECTION_LINES or (
+                len(current) >= MIN_SECTION_LINES
+                and zlib.crc32(line.encode('utf-8')) % BOUNDARY_MODULUS == 0):
+            flush()
+
+    if current:
+        flush()
+
+    return sections
+
+
+def evaluate_section(section_text, keywords):
+    """
+    Check keywords against one section.
+    Returns {keyword: 1} for keywords with a whole-word occurrence and
+    {keyword: 0} for keywords only found inside longer words.
+    """
+    index = DocumentIndex(section_text)
+    counts = index.scan_keywords(keywords)
+
+    hits = {}
+    for keyword, (count, _) in counts.items():
+        if count:
+            hits[keyword] = 1 if index.first_occurrence(keyword) is not None else 0
+    return hits
+
+
+def load_cache(cache_path):
+    """Load a section cache, returning an empty one if missing or stale."""
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        if cache.get('version') == CACHE_VERSION:
+            return cache
+    except (OSError, ValueError):
+        pass
+    return {'version': CACHE_VERSION, 'keywords': [], 'sections': {}}
+
+
+def save_cache(cache_path, cache):
+    """Write the cache atomically so an interrupted run cannot corrupt it."""
+    tmp_path = f"{cache_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        # json.dumps uses the C encoder; json.dump streams through the slow one
+        f.write(json.dumps(cache))
+    os.replace(tmp_path, cache_path)
+
+
+def analyze_incremental(requirements, document_content, cache_path):
+    """
+    Analyze compliance like analyze_compliance (keyword mode), reusing cached
+    per-section results. Hits are cached per keyword, which requirements
+    share, so new requirements only cost their new keywords. Only sections
+    of the current document and keywords of the current requirements are
+    kept in the cache, so it does not grow with every requirement set seen.
+    Returns categorized results plus a 'sections' summary.
+    """
+    cache = load_cache(cache_path)
+    cached_keywords = set(cache['keywords'])
+
+    req_keywords = [extract_keywords(req['requirement'].lower()) for req in requirements]
+    batch_keywords = set()
+    for keywords in req_keywords:
+        batch_keywords.update(keywords[:5])
+
+    # Every cached section was checked against exactly the cached keywords
+    new_keywords = batch_keywords - cached_keywords
+
+    sections = {}
+    present = set()
+    first_section = {}
+    section_texts = []
+    rechecked = 0
+
+    for position, (section_hash, text) in enumerate(split_sections(document_content)):
+        section_texts.append(text)
+        entry = sections.get(section_hash)
+        if entry is None:
+            entry = cache['sections'].get(section_hash)
+            if entry is None:
+                entry = evaluate_section(text, batch_keywords)
+                rechecked += 1
+            else:
+                entry = {k: v for k, v in entry.items() if k in batch_keywords}
+                if new_keywords:
+                    entry.update(evaluate_section(text, new_keywords))
+            sections[section_hash] = entry
+
+        # Document order: remember the first section with a whole-word hit
+        present.update(entry)
+        for keyword, whole_word in entry.items():
+            if whole_word and keyword not in first_section:
+                first_section[keyword] = position
+
+    # Evidence comes from each keyword's first whole-word section only
+    keywords_by_section = {}
+    for keyword in batch_keywords:
+        if keyword in first_section:
+            keywords_by_section.setdefault(first_section[keyword], []).append(keyword)
+
+    evidence = {}
+    for position, keywords in keywords_by_section.items():
+        index = DocumentIndex(section_texts[position])
+        for keyword in keywords:
+            evidence[keyword] = index.evidence_window(keyword)
+
+    results = new_results(len(requirements))
+    for req, keywords in zip(requirements, req_keywords):
+        req['found'], req['evidence'] = evaluate_keywords(keywords, present.__contains__, evidence.get)
+        record_result(results, req)
+
+    results['sections'] = {'total': len(sections), 'rechecked': rechecked}
+
+    # Unchanged documents leave the cache as it is
+    if rechecked or batch_keywords != cached_keywords or len(sections) != len(cache['sections']):
+        save_cache(cache_path, {
+            'version': CACHE_VERSION,
+            'keywords': sorted(batch_keywords),
+            'sections': sections
+        })
+
+    return results
+
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Resident notebook selector service.
+Keeps the NotebookLM library index in memory and answers selection
+requests on a local Unix socket, one JSON object per line each way, so
+frequent callers skip interpreter startup and library loading. The library
+is checked on every request and reloaded as soon as library.json changes.
+"""
+
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+from pathlib import Path
+
+from library_index import load_library_index
+from notebook_selector import (
+    default_service_socket,
+    extract_keywords,
+    resolve_notebooklm_library_path,
+    selection_result,
+)
+
+
+class SelectorHandler(socketserver.StreamRequestHandler):
+    """Answer requests on one connection until the client disconnects."""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                response = self.server.select(json.loads(line))
+            except Exception as e:
+                response = {'error': str(e)}
+            self.wfile.write((json.dumps(response) + '\n').encode('utf-8'))
+
+
+class SelectorServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Unix socket server holding one library index.
+    Requests are {"keywords": [...]} or {"text": "..."} with optional
+    "threshold" and "top_k"; responses match notebook_selector.py output.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path, library_path):
+        self.library_path = Path(library_path)
+        self.index = None
+        self.reload_error = None
+        self.lock = threading.Lock()
+        # Fail at startup, not on the first request, if the library is unusable
+        self.current_index()
+        super().__init__(str(socket_path), SelectorHandler)
+
+    def server_bind(self):
+        # Only the current user may connect to the socket
+        old_umask = os.umask(0o177)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(old_umask)
+
+    def current_index(self):
+        """Return the library index, reloading it if library.json changed."""
+        try:
+            index = load_library_index(self.library_path)
+        except (OSError, ValueError) as e:
+            if self.index is None:
+                raise
+            # Keep answering from the last good index, e.g. while the library is rewritten
+            if str(e) != self.reload_error:
+                print(f"Library reload failed, serving previous index: {e}", file=sys.stderr)
+                self.reload_error = str(e)
+            return self.index
+
+        self.reload_error = None
+
+        if self.index is not None and index is not self.index:
+            print(f"Reloaded library index ({len(index.notebooks)} notebooks)", file=sys.stderr)
+        self.index = index
+        return index
+
+    def select(self, request):
+        if not isinstance(request, dict):
+            raise ValueError('request must be a JSON object')
+        keywords = request.get('keywords')
+        if keywords is None:
+            keywords = extract_keywords(str(request.get('text', '')))
+        if not isinstance(keywords, list) or not all(isinstance(k, str) for k in keywords):
+            raise ValueError('keywords must be a list of strings')
+        threshold = int(request.get('threshold', 5))
+        top_k = request.get('top_k')
+        top_k = int(top_k) if top_k is not None else None
+
+        with self.lock:
+            index = self.current_index()
+            selected = [
+                {'notebook': index.notebooks[notebook_id], 'score': score}
+                for notebook_id, score in index.select(keywords, threshold, top_k)
+            ] if index.notebooks else []
+        return selection_result(keywords, selected)
+
+
+def claim_socket_path(socket_path):
+    """Remove a socket left behind by a dead service; False if one is still running."""
+    if not os.path.exists(socket_path):
+        return True
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(str(socket_path))
+        return False
+    except OSError:
+        os.remove(socket_path)
+        return True
+
+
+def main():
+    """
+    Usage: python selector_service.py [--socket PATH] [--library PATH]
+    """
+    socket_path = default_service_socket()
+    library_path = None
+
+    if '--socket' in sys.argv:
+        idx = sys.argv.index('--socket')
+        if idx + 1 < len(sys.argv):
+            socket_path = Path(sys.argv[idx + 1])
+
+    if '--library' in sys.argv:
+        idx = sys.argv.index('--library')
+        if idx + 1 < len(sys.argv):
+            library_path = Path(sys.argv[idx + 1])
+
+    library_path = library_path or resolve_notebooklm_library_path()
+    if not library_path.exists():
+        print(f"Error: NotebookLM library not found: {library_path}", file=sys.stderr)
+        sys.exit(1)
+
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    if not claim_socket_path(socket_path):
+        print(f"Error: a selector service is already listening on {socket_path}", file=sys.stderr)
+        sys.exit(1)
+
+    server = SelectorServer(socket_path, library_path)
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"Serving {len(server.index.notebooks)} notebooks from {library_path} on {socket_path}",
+          file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        try:
+            os.remove(socket_path)
+        except OSError:
+            pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Fake NotebookLM worker speaking the notebooklm_worker.py frame protocol.
+Runs reviews without NotebookLM:
+
+    NBLM_WORKER_COMMAND="python3 tests/fake_worker.py" python3 scripts/review_document.py doc.docx --worker
+
+Every question is answered with "<notebook_id> answered by <pid>: <question>",
+except questions starting with:
+  sleep SECONDS  answer after SECONDS
+  crash          exit without answering
+  reorder        answer with the wrong request id
+  fail           answer with an error
+FAKE_WORKER_START=crash exits before the ready handshake and
+FAKE_WORKER_START=fail reports that the skill could not be loaded.
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'scripts'))
+
+from notebooklm_worker import read_frame, write_frame  # noqa: E402
+
+
+def main():
+    frames_in = sys.stdin.buffer
+    frames_out = sys.stdout.buffer
+
+    start = os.environ.get('FAKE_WORKER_START')
+    if start == 'crash':
+        return 1
+    if start == 'fail':
+        write_frame(frames_out, {'error': 'fake worker refused to start'})
+        return 1
+    write_frame(frames_out, {'ready': True})
+
+    while True:
+        request = read_frame(frames_in)
+        if request is None:
+            return 0
+        question = request['question']
+        command = question.split()[0] if question.split() else ''
+
+        response = {'id': request['id']}
+        if command == 'sleep':
+            time.sleep(float(question.split()[1]))
+        elif command == 'crash':
+            return 1
+        elif command == 'reorder':
+            response['id'] += 1
+        elif command == 'fail':
+            response['error'] = 'Failed to query notebook: fake failure'
+            write_frame(frames_out, response)
+            continue
+        response['answer'] = f"{request['notebook_id']} answered by {os.getpid()}: {question}"
+        write_frame(frames_out, response)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Tests for streaming keyword extraction and selection results in notebook_selector."""
+
+import io
+import json
+import shutil
+import sys
+import tempfile
+import unittest
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'scripts'))
+
+from notebook_selector import (  # noqa: E402
+    count_keywords,
+    extract_keywords,
+    iter_keyword_chunks,
+    select_for_keywords,
+    stream_keywords,
+)
+
+
+class IterKeywordChunksTest(unittest.TestCase):
+
+    def count_streamed(self, text, chunk_size):
+        counts = Counter()
+        pieces = list(iter_keyword_chunks(io.StringIO(text), chunk_size))
+        for piece in pieces:
+            count_keywords(piece, counts)
+        return counts, pieces
+
+    def test_pieces_match_whole_text(self):
+        text = 'Governance oversight, customer diligence; risk-based monitoring.\n' * 50
+        # Every chunk size at least as long as the longest word
+        for chunk_size in (10, 16, 37, 1000):
+            counts, _ = self.count_streamed(text, chunk_size)
+            self.assertEqual(counts, count_keywords(text))
+
+    def test_long_token_is_bounded_and_counted_once(self):
+        chunk_size = 16
+        token = 'x' * 10000
+        text = f"alpha {token} beta gamma"
+
+        counts, pieces = self.count_streamed(text, chunk_size)
+
+        self.assertLess(max(len(piece) for piece in pieces), 2 * chunk_size)
+        long_words = [word for word in counts if word.startswith('x')]
+        self.assertEqual(len(long_words), 1)
+        self.assertEqual(counts[long_words[0]], 1)
+        self.assertEqual(counts['alpha'], 1)
+        self.assertEqual(counts['beta'], 1)
+        self.assertEqual(counts['gamma'], 1)
+
+    def test_long_token_at_end_of_stream(self):
+        counts, pieces = self.count_streamed('alpha ' + 'y' * 100, 8)
+        self.assertLess(max(len(piece) for piece in pieces), 16)
+        self.assertEqual(sum(counts.values()), 2)
+
+    def test_stream_keywords_matches_extract_keywords(self):
+        text = 'Sanctions screening and transaction monitoring for every customer. ' * 200
+        self.assertEqual(stream_keywords(io.StringIO(text)), extract_keywords(text))
+
+
+class SelectionStampTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.library_path = Path(self.tmp) / 'library.json'
+        self.notebook = {
+            'id': 'aml',
+            'name': 'AML policy',
+            'url': 'https://notebooklm.google.com/notebook/aml',
+            'description': 'Sanctions screening rules',
+            'topics': ['kyc']
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def stamp(self):
+        self.library_path.write_text(json.dumps({'notebooks': {'aml': self.notebook}}))
+        result, error = select_for_keywords(['sanctions'], 1, self.library_path)
+        self.assertIsNone(error)
+        return result['notebooks'][0]['stamp']
+
+    def test_stamp_covers_the_full_library_entry(self):
+        stamp = self.stamp()
+        self.assertEqual(self.stamp(), stamp)
+
+        # The description is not part of the selection result, but still
+        # invalidates cached answers
+        self.notebook['description'] = 'Sanctions screening rules, updated'
+        self.assertNotEqual(self.stamp(), stamp)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Tests for the NotebookLM worker pool, driven by tests/fake_worker.py."""
+
+import os
+import shlex
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+TESTS_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(TESTS_DIR.parent / 'scripts'))
+
+from notebooklm_worker import WORKER_COMMAND_ENV, WorkerPool, WorkerUnavailable  # noqa: E402
+from review_document import query_notebook  # noqa: E402
+
+FAKE_WORKER = f"{shlex.quote(sys.executable)} {shlex.quote(str(TESTS_DIR / 'fake_worker.py'))}"
+
+ENV_VARS = (WORKER_COMMAND_ENV, 'FAKE_WORKER_START', 'NOTEBOOKLM_SKILL_DIR')
+
+
+def worker_pid(answer):
+    """Pid of the fake worker that produced answer."""
+    return int(answer.split(' answered by ')[1].split(':')[0])
+
+
+class WorkerPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.old_env = {name: os.environ.get(name) for name in ENV_VARS}
+        os.environ[WORKER_COMMAND_ENV] = FAKE_WORKER
+        os.environ.pop('FAKE_WORKER_START', None)
+        self.pool = WorkerPool(self.tmp)
+
+    def tearDown(self):
+        self.pool.close()
+        for name, value in self.old_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        shutil.rmtree(self.tmp)
+
+    def test_answer_reuses_worker(self):
+        answer, error = self.pool.ask('nb', 'what is required?', timeout=10)
+        self.assertIsNone(error)
+        self.assertTrue(answer.startswith('nb answered by '))
+        self.assertTrue(answer.endswith(': what is required?'))
+
+        again, error = self.pool.ask('nb2', 'and now?', timeout=10)
+        self.assertIsNone(error)
+        self.assertEqual(worker_pid(again), worker_pid(answer))
+
+    def test_timeout_restarts_worker(self):
+        first, _ = self.pool.ask('nb', 'hello', timeout=10)
+
+        answer, error = self.pool.ask('nb', 'sleep 5', timeout=0.3)
+        self.assertIsNone(answer)
+        self.assertIn('Timed out after 0.3s', error)
+
+        answer, error = self.pool.ask('nb', 'hello', timeout=10)
+        self.assertIsNone(error)
+        self.assertNotEqual(worker_pid(answer), worker_pid(first))
+
+    def test_out_of_order_response_is_an_error(self):
+        answer, error = self.pool.ask('nb', 'reorder', timeout=10)
+        self.assertIsNone(answer)
+        self.assertIn('out of order', error)
+        self.assertIsNone(self.pool.ask('nb', 'hello', timeout=10)[1])
+
+    def test_worker_error_keeps_worker(self):
+        first, _ = self.pool.ask('nb', 'hello', timeout=10)
+        self.assertEqual(self.pool.ask('nb', 'fail', timeout=10),
+                         (None, 'Failed to query notebook: fake failure'))
+        answer, _ = self.pool.ask('nb', 'hello', timeout=10)
+        self.assertEqual(worker_pid(answer), worker_pid(first))
+
+    def test_crash_during_question_restarts_worker(self):
+        answer, error = self.pool.ask('nb', 'crash', timeout=10)
+        self.assertIsNone(answer)
+        self.assertIn('exited unexpectedly', error)
+        self.assertIsNone(self.pool.ask('nb', 'hello', timeout=10)[1])
+
+    def test_crash_on_start_falls_back_to_process(self):
+        os.environ['FAKE_WORKER_START'] = 'crash'
+        with self.assertRaises(WorkerUnavailable):
+            self.pool.ask('nb', 'hello', timeout=10)
+        self.assertEqual(self.pool.error, 'worker did not start')
+
+        skill_dir = Path(self.tmp) / 'skill'
+        (skill_dir / 'scripts').mkdir(parents=True)
+        (skill_dir / 'scripts' / 'run.py').write_text("print('Question: hello')\nprint('Answered by the skill')\n")
+        os.environ['NOTEBOOKLM_SKILL_DIR'] = str(skill_dir)
+
+        self.assertEqual(query_notebook('nb', 'hello', timeout=10, workers=self.pool),
+                         ('Answered by the skill', None))
+
+    def test_failed_start_reports_error(self):
+        os.environ['FAKE_WORKER_START'] = 'fail'
+        with self.assertRaises(WorkerUnavailable):
+            self.pool.ask('nb', 'hello', timeout=10)
+        self.assertEqual(self.pool.error, 'fake worker refused to start')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Tests for notebook queries and answer caching in review_document."""
+
+import os
+import shutil
+import sys
+import tempfile
+import textwrap
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'scripts'))
+
+from answer_cache import AnswerCache  # noqa: E402
+from review_document import query_notebook  # noqa: E402
+
+
+def make_skill(root, output):
+    """Create a fake NotebookLM skill whose run.py prints output and exits 0."""
+    scripts = Path(root) / 'scripts'
+    scripts.mkdir(parents=True)
+    (scripts / 'run.py').write_text(f"print({output!r})\n")
+
+
+class QueryNotebookTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.cache_dir = Path(self.tmp) / 'answers'
+        self.old_skill_dir = os.environ.get('NOTEBOOKLM_SKILL_DIR')
+
+    def tearDown(self):
+        if self.old_skill_dir is None:
+            os.environ.pop('NOTEBOOKLM_SKILL_DIR', None)
+        else:
+            os.environ['NOTEBOOKLM_SKILL_DIR'] = self.old_skill_dir
+        shutil.rmtree(self.tmp)
+
+    def use_skill(self, output):
+        skill_dir = Path(self.tmp) / 'skill'
+        make_skill(skill_dir, output)
+        os.environ['NOTEBOOKLM_SKILL_DIR'] = str(skill_dir)
+
+    def test_answer_is_parsed_and_cached(self):
+        self.use_skill(textwrap.dedent("""\
+            Question: what is required?
+            Keep records for five years.
+            EXTREMELY IMPORTANT: ask follow-up questions
+        """))
+        cache = AnswerCache(self.cache_dir)
+
+        self.assertEqual(query_notebook('nb', 'what is required?', cache=cache),
+                         ('Keep records for five years.', None))
+        self.assertEqual(query_notebook('nb', 'what is required?', cache=cache),
+                         ('Keep records for five years.', None))
+        self.assertEqual(cache.hits, 1)
+
+    def test_output_without_answer_is_an_error_and_not_cached(self):
+        self.use_skill('Please log in first')
+        cache = AnswerCache(self.cache_dir)
+
+        for _ in range(2):
+            answer, error = query_notebook('nb', 'what is required?', cache=cache)
+            self.assertIsNone(answer)
+            self.assertIn('Please log in first', error)
+        self.assertEqual(cache.hits, 0)
+        self.assertFalse(self.cache_dir.exists() and any(self.cache_dir.iterdir()))
+
+    def test_empty_answer_is_an_error_and_not_cached(self):
+        self.use_skill('Question: what is required?\n\nEXTREMELY IMPORTANT: ask follow-up questions')
+        cache = AnswerCache(self.cache_dir)
+
+        answer, error = query_notebook('nb', 'what is required?', cache=cache)
+        self.assertIsNone(answer)
+        self.assertIn('empty answer', error)
+        self.assertIsNone(cache.get('nb', 'what is required?'))
+
+
+if __name__ == '__main__':
+    unittest.main()
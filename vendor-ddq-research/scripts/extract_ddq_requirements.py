@@ -8,11 +8,13 @@ import argparse
 import csv
 import json
 import re
-import zipfile
+import sys
 from pathlib import Path
-from xml.etree import ElementTree as ET
 
-W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+# DOCX parsing and the extraction cache come from the sibling nblm-doc-review
+# skill, so both skills share one extractor and the same cache entries
+sys.path.append(str(Path(__file__).resolve().parents[2] / "nblm-doc-review" / "scripts"))
+from extract_content import iter_document_paragraphs  # noqa: E402
 
 
 def normalize_text(text):
@@ -61,16 +63,12 @@ def collect_docx_paths(inputs):
     return unique
 
 
-def extract_paragraph_texts(docx_path):
+def extract_paragraph_texts(docx_path, use_cache=True):
     rows = []
-    with zipfile.ZipFile(docx_path, "r") as zf:
-        xml_bytes = zf.read("word/document.xml")
-    root = ET.fromstring(xml_bytes)
     current_section = ""
 
-    for p in root.iter(f"{W_NS}p"):
-        text_parts = [t.text or "" for t in p.iter(f"{W_NS}t")]
-        text = normalize_text("".join(text_parts))
+    for raw_text in iter_document_paragraphs(docx_path, use_cache):
+        text = normalize_text(raw_text)
         if not text:
             continue
 
@@ -108,6 +106,11 @@ def main():
         help="Input .docx file or directory containing .docx files (repeatable).",
     )
     parser.add_argument("--output-dir", required=True, help="Output directory.")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-parse documents instead of using the shared extraction cache.",
+    )
     args = parser.parse_args()
 
     out_dir = Path(args.output_dir).expanduser()
@@ -121,7 +124,7 @@ def main():
     req_id = 1
 
     for doc in docx_files:
-        for row in extract_paragraph_texts(doc):
+        for row in extract_paragraph_texts(doc, use_cache=not args.no_cache):
             text = row["text"]
             if not is_requirement_line(text):
                 continue